@@ -1,39 +1,122 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
+from sqlmodel.ext.asyncio.session import AsyncSession
 from starlette import status
 
 from auth import schema, services
-from config.db import Session, get_session
-from core import responses
-from core.exceptions import BadRequestError
+from config.db import get_async_session
+from config.settings import settings
+from core import keys, responses, revocation
+from core.deps import get_current_user
+from core.exceptions import BadRequestError, ServiceUnavailableError, UnauthorizedError
+from core.hashing import PasswordHasherBusyError
+from core.rate_limit import RateLimit, RateLimitRule, get_email_key
+from core.security import JWTBearer
+from core.token import Token, TokenError
+from models import User
 
 router = APIRouter()
+well_known_router = APIRouter()
+
+login_account_limit = RateLimit(
+    "login:account",
+    RateLimitRule(
+        settings.LOGIN_RATE_LIMIT_PER_ACCOUNT, settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS
+    ),
+    key=get_email_key,
+)
 
 
 @router.post(
     "/login",
-    responses=responses.UNAUTHORIZED | responses.PERMISSION_DENIED,
+    responses=responses.UNAUTHORIZED
+    | responses.PERMISSION_DENIED
+    | responses.TOO_MANY_REQUESTS
+    | responses.SERVICE_UNAVAILABLE,
+    response_model=schema.TokensSchema,
+    dependencies=[Depends(login_account_limit)],
 )
-def login(form_data: schema.UserLoginSchema, session: Session = Depends(get_session)):
+async def login(
+    form_data: schema.UserLoginSchema,
+    session: AsyncSession = Depends(get_async_session),
+):
     """Login to as a user"""
-    access_token = services.get_access_token_for_user(
-        session, form_data.email, form_data.password
-    )
+    try:
+        access, refresh = await services.get_tokens_for_user(
+            session, form_data.email, form_data.password
+        )
+    except PasswordHasherBusyError:
+        raise ServiceUnavailableError
+
+    return {"access": access, "refresh": refresh}
+
+
+@router.post(
+    "/refresh",
+    responses=responses.UNAUTHORIZED,
+    response_model=schema.TokensSchema,
+)
+async def refresh(
+    form_data: schema.RefreshSchema,
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Exchange refresh token for new access and refresh tokens"""
+    try:
+        access, refresh = await services.refresh_tokens(session, form_data.refresh)
+    except TokenError:
+        raise UnauthorizedError
 
-    return {"access": access_token}
+    return {"access": access, "refresh": refresh}
 
 
 @router.post(
     "/register",
-    responses=responses.BAD_REQUEST,
+    responses=responses.BAD_REQUEST
+    | responses.TOO_MANY_REQUESTS
+    | responses.SERVICE_UNAVAILABLE,
     status_code=status.HTTP_201_CREATED,
 )
-def register(
-    form_data: schema.UserRegisterSchema, session: Session = Depends(get_session)
+async def register(
+    form_data: schema.UserRegisterSchema,
+    session: AsyncSession = Depends(get_async_session),
 ):
     """Register user"""
     try:
-        services.register_user(session, form_data)
-    except Exception:
-        raise BadRequestError("User with this email already registered")
+        await services.register_user(session, form_data)
+    except PasswordHasherBusyError:
+        raise ServiceUnavailableError
+    except services.UserAlreadyExistsError as e:
+        raise BadRequestError(str(e))
 
     return form_data
+
+
+@router.post(
+    "/logout",
+    responses=responses.UNAUTHORIZED,
+    status_code=status.HTTP_204_NO_CONTENT,
+)
+async def logout(
+    form_data: schema.LogoutSchema | None = None,
+    token: str = Depends(JWTBearer(scheme_name="Bearer")),
+    session: AsyncSession = Depends(get_async_session),
+    user: User = Depends(get_current_user),
+):
+    """Revoke current access token and refresh tokens of given or all sessions"""
+
+    refresh = form_data.refresh if form_data else None
+    try:
+        await services.revoke_refresh_tokens(session, user, refresh)
+    except TokenError:
+        raise UnauthorizedError
+
+    claims = Token.get_claims_from_string(token)
+    if "jti" in claims:
+        await revocation.revoke_async(session, claims)
+
+
+@well_known_router.get("/jwks.json")
+async def jwks(response: Response):
+    """Public keys for verifying access tokens"""
+
+    response.headers["Cache-Control"] = f"public, max-age={settings.JWKS_CACHE_MAX_AGE}"
+    return keys.key_ring.jwks() if keys.key_ring else {"keys": []}
@@ -12,3 +12,16 @@ class UserLoginSchema(BaseAuthSchema):
 
 class UserRegisterSchema(BaseAuthSchema):
     pass
+
+
+class RefreshSchema(BaseModel):
+    refresh: str
+
+
+class LogoutSchema(BaseModel):
+    refresh: str | None = None
+
+
+class TokensSchema(BaseModel):
+    access: str
+    refresh: str
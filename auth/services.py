@@ -1,41 +1,204 @@
+import uuid
 from datetime import datetime, timedelta
 
 from fastapi import HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
+from sqlalchemy import delete, insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.sql import Insert
 from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from auth import schema
 from config.db import Session
 from config.settings import settings
-from core.token import Token
+from core import hashing
+from core.known_emails import known_emails
+from core.token import RefreshToken, Token, TokenError
+from models.refresh_token import IssuedRefreshToken
 from models.user import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 
-def get_access_token_for_user(session: Session, email: str, password: str) -> str:
-    user_query = select(User).where(User.email == email)
-    user = session.exec(user_query).first()
+class UserAlreadyExistsError(Exception):
+    pass
 
-    if not user or not user.check_password(password):
+
+class RefreshTokenReuseError(TokenError):
+    pass
+
+
+async def _get_user_by_email(session: AsyncSession, email: str) -> User | None:
+    result = await session.exec(select(User).where(User.email == email))
+    return result.first()
+
+
+_dummy_password_hash: str | None = None
+
+
+async def _verify_dummy_password(password: str) -> None:
+    global _dummy_password_hash
+    if _dummy_password_hash is None:
+        _dummy_password_hash = await hashing.password_hasher.run(
+            hashing.hash_password, "dummy password"
+        )
+    await hashing.password_hasher.run(
+        hashing.verify_and_update_password, password, _dummy_password_hash
+    )
+
+
+async def _equalize_unknown_email_timing(password: str) -> None:
+    """
+    Make login of unknown email take as long as password verification,
+    so response time doesn't reveal which emails are registered
+    """
+    policy = settings.LOGIN_TIMING_POLICY
+    if policy == "delay" and hashing.password_hasher.average_seconds is not None:
+        # Sleeping costs no CPU, unlike hashing dummy password
+        await hashing.password_hasher.sleep()
+    elif policy != "none":
+        await _verify_dummy_password(password)
+
+
+async def get_tokens_for_user(
+    session: AsyncSession, email: str, password: str
+) -> tuple[str, str]:
+    user = None
+    if await known_emails.might_exist_async(session, email):
+        user = await _get_user_by_email(session, email)
+
+    if not user:
+        await _equalize_unknown_email_timing(password)
         raise HTTPException(status_code=401, detail="Unauthorized")
 
-    now = datetime.utcnow()
-    token = Token.generate_token_for_user(user, instantiation_time=now)
-    return token
+    password_hash = user.password
+    if not await user.verify_and_update_password_async(password):
+        raise HTTPException(status_code=401, detail="Unauthorized")
 
+    if user.password != password_hash:
+        session.add(user)
 
-def register_user(session: Session, data: schema.UserRegisterSchema) -> User:
-    if session.exec(select(1).where(User.email == data.email)).first():
-        raise Exception("Customer with this email is already registered")
+    now = datetime.utcnow()
+    access = Token.generate_token_for_user(user, instantiation_time=now)
+    refresh = _issue_refresh_token(session, user, now, family=uuid.uuid4().hex)
+    await session.commit()
+
+    return access, refresh
+
+
+def _issue_refresh_token(
+    session: AsyncSession, user: User, now: datetime, family: str
+) -> str:
+    """
+    Add record of new refresh token to session, caller commits it
+    """
+    jti = uuid.uuid4().hex
+    session.add(
+        IssuedRefreshToken(
+            jti=jti,
+            family=family,
+            user_id=user.id,
+            expires_at=now + RefreshToken.lifetime,
+        )
+    )
+    return RefreshToken.generate_token_for_user(
+        user, instantiation_time=now, extra_claims={"jti": jti, "family": family}
+    )
 
-    user = User(email=data.email)
-    user.set_password(data.password)
 
-    session.add(user)
-    session.commit()
+async def refresh_tokens(session: AsyncSession, token_string: str) -> tuple[str, str]:
+    """
+    Exchange refresh token for new access and refresh tokens
+    Every refresh token is accepted once. Presenting used one means it was stolen,
+    so the whole family (all tokens rotated from the same login) is revoked
+    """
+    claims = RefreshToken.get_claims_from_string(token_string)
+
+    # Marking token as used is atomic, so concurrent refreshes can't both succeed
+    result = await session.execute(
+        update(IssuedRefreshToken)
+        .where(IssuedRefreshToken.jti == claims["jti"])
+        .where(IssuedRefreshToken.is_used == False)  # noqa: E712
+        .values(is_used=True)
+    )
+    if not result.rowcount:
+        revoked = await session.execute(
+            delete(IssuedRefreshToken).where(
+                IssuedRefreshToken.family == claims["family"]
+            )
+        )
+        await session.commit()
+        if revoked.rowcount:
+            raise RefreshTokenReuseError(RefreshToken.error_message)
+        raise TokenError(RefreshToken.error_message)
+
+    user = await session.get(User, int(claims["sub"]))
+    if user is None:
+        raise TokenError(RefreshToken.error_message)
 
+    now = datetime.utcnow()
+    access = Token.generate_token_for_user(user, instantiation_time=now)
+    refresh = _issue_refresh_token(session, user, now, family=claims["family"])
+    await session.commit()
+
+    return access, refresh
+
+
+async def revoke_refresh_tokens(
+    session: AsyncSession, user: User, token_string: str | None = None
+) -> None:
+    """
+    Delete family of given refresh token, or all refresh tokens of user
+    """
+    query = delete(IssuedRefreshToken).where(IssuedRefreshToken.user_id == user.id)
+    if token_string is not None:
+        claims = RefreshToken.get_claims_from_string(token_string)
+        query = query.where(IssuedRefreshToken.family == claims["family"])
+    await session.execute(query)
+    await session.commit()
+
+
+def _get_insert_user_query(dialect_name: str, values: dict) -> Insert:
+    """
+    Insert which skips duplicate email instead of failing where dialect allows it
+    """
+    if dialect_name == "postgresql":
+        query = postgresql.insert(User).values(values).returning(User.id)
+        return query.on_conflict_do_nothing(index_elements=[User.email])
+    if dialect_name == "sqlite":
+        query = sqlite.insert(User).values(values)
+        return query.on_conflict_do_nothing(index_elements=[User.email])
+    return insert(User).values(values)
+
+
+async def register_user(session: AsyncSession, data: schema.UserRegisterSchema) -> User:
+    """
+    Create user with single INSERT, unique constraint on email detects duplicates
+    """
+    user = User(email=data.email)
+    await user.set_password_async(data.password)
+
+    dialect_name = session.get_bind().dialect.name
+    values = {"email": user.email, "password": user.password, "is_admin": user.is_admin}
+    try:
+        result = await session.execute(_get_insert_user_query(dialect_name, values))
+    except IntegrityError:
+        await session.rollback()
+        raise UserAlreadyExistsError("User with this email already registered")
+
+    if dialect_name == "postgresql":
+        user.id = result.scalar()
+    elif result.rowcount:
+        user.id = result.inserted_primary_key[0]
+    await session.commit()
+
+    if user.id is None:
+        raise UserAlreadyExistsError("User with this email already registered")
+
+    known_emails.add(user.email)
     return user
 
 
@@ -61,5 +224,6 @@ def create_admin_user(session: Session, *, email: str, password: str):
 
     session.add(user)
     session.commit()
+    known_emails.add(user.email)
 
     return user
@@ -0,0 +1,81 @@
+"""
+Per row BaseCRUDService.create/update/delete compared with bulk methods
+
+    python -m benchmarks.crud_bulk --rows 10000
+"""
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+import typer
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, SQLModel, select
+
+import crud
+from config.db import get_sqlite_pragmas, install_sqlite_pragmas
+from models import User
+
+cli = typer.Typer()
+
+
+def _timed(func: Callable[[], object]) -> float:
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+
+def _run(engine: Engine, rows: int, bulk: bool) -> dict[str, float]:
+    data_list = [{"email": f"user-{i}@test.com"} for i in range(rows)]
+
+    # Objects are not expired on commit, so per row path is not penalized by reloads
+    with Session(engine, expire_on_commit=False) as session:
+        if bulk:
+            create = _timed(lambda: crud.user.bulk_create(session, data_list))
+        else:
+            create = _timed(lambda: [crud.user.create(session, d) for d in data_list])
+
+        users = session.exec(select(User)).all()
+        ids = [user.id for user in users]
+
+        if bulk:
+            update = _timed(
+                lambda: crud.user.bulk_update(session, ids, {"full_name": "Name"})
+            )
+            delete = _timed(lambda: crud.user.bulk_delete(session, ids))
+        else:
+            update = _timed(
+                lambda: [
+                    crud.user.update(session, u, {"full_name": "Name"}) for u in users
+                ]
+            )
+            delete = _timed(lambda: [crud.user.delete(session, u) for u in users])
+
+    return {"create": create, "update": update, "delete": delete}
+
+
+@cli.command()
+def main(rows: int = typer.Option(10_000)) -> None:
+    """
+    Print seconds and rows per second of every operation
+    """
+    for name, bulk in [("per row", False), ("bulk", True)]:
+        with tempfile.TemporaryDirectory() as directory:
+            engine = create_engine(f"sqlite:///{Path(directory) / 'bench.sqlite'}")
+            install_sqlite_pragmas(engine, get_sqlite_pragmas())
+            SQLModel.metadata.create_all(engine)
+            result = _run(engine, rows, bulk)
+            engine.dispose()
+
+        typer.echo(
+            f"{name:>8}: "
+            + " ".join(
+                f"{operation} {seconds:7.3f}s ({rows / seconds:9.0f} rows/s)"
+                for operation, seconds in result.items()
+            )
+        )
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,78 @@
+"""
+Default FastAPI response serialization of users page compared with ORJSONResponse,
+the default response class when ORJSON_RESPONSE is on, and with trusted path of
+user list routes, which skips response_model validation and jsonable_encoder
+
+    python -m benchmarks.json_response --items 100
+"""
+import asyncio
+import time
+from typing import Any, Callable
+
+import typer
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from fastapi_pagination import Page, Params
+
+from user.schema import ListUserSchema
+
+cli = typer.Typer()
+
+
+def _timed(func: Callable[[], Any], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat
+
+
+@cli.command()
+def main(items: int = typer.Option(100), repeat: int = typer.Option(1000)) -> None:
+    """
+    Print time to serialize single page
+    """
+    rows = [{"id": i, "email": f"user-{i}@test.com"} for i in range(items)]
+    page = Page[ListUserSchema].create(rows, Params(size=items), total=items)
+    field = create_response_field("response", Page[ListUserSchema])
+    loop = asyncio.new_event_loop()
+
+    def default() -> bytes:
+        # response_model validation, jsonable_encoder and json.dumps
+        content = loop.run_until_complete(
+            serialize_response(field=field, response_content=page)
+        )
+        return JSONResponse(content).body
+
+    def default_orjson() -> bytes:
+        content = loop.run_until_complete(
+            serialize_response(field=field, response_content=page)
+        )
+        return ORJSONResponse(content).body
+
+    def trusted() -> bytes:
+        # Route returns already validated page with default response class
+        return JSONResponse(page.dict()).body
+
+    def trusted_orjson() -> bytes:
+        return ORJSONResponse(page.dict()).body
+
+    assert default() == default_orjson() == trusted() == trusted_orjson()
+    results = {
+        "default": _timed(default, repeat),
+        "default + orjson": _timed(default_orjson, repeat),
+        "trusted": _timed(trusted, repeat),
+        "trusted + orjson": _timed(trusted_orjson, repeat),
+    }
+    loop.close()
+
+    baseline = results["default"]
+    for name, seconds in results.items():
+        typer.echo(
+            f"{name:>16}: {seconds * 1000:8.3f}ms per page"
+            f" ({baseline / seconds:5.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,112 @@
+"""
+Concurrent read/write throughput of SQLite with default and tuned pragmas
+
+    python -m benchmarks.sqlite_pragmas --readers 4 --writers 2 --duration 5
+"""
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+import typer
+from sqlalchemy import create_engine, func
+from sqlalchemy import select as sa_select
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, SQLModel, select
+
+from config.db import get_sqlite_pragmas, install_sqlite_pragmas
+from models import User
+
+cli = typer.Typer()
+
+
+def _create_engine(path: Path, pragmas: dict[str, Any] | None) -> Engine:
+    engine = create_engine(
+        f"sqlite:///{path}", connect_args={"check_same_thread": False}
+    )
+    if pragmas:
+        install_sqlite_pragmas(engine, pragmas)
+    return engine
+
+
+def _seed(engine: Engine, rows: int) -> None:
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(User(email=f"seed-{i}@test.com") for i in range(rows))
+        session.commit()
+
+
+def _run(engine: Engine, readers: int, writers: int, duration: float) -> dict:
+    stop = threading.Event()
+    counters = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def count(key: str) -> None:
+        with lock:
+            counters[key] += 1
+
+    def read() -> None:
+        with Session(engine) as session:
+            while not stop.is_set():
+                try:
+                    total = sa_select(func.count()).select_from(User)
+                    session.execute(total).scalar_one()
+                    session.exec(select(User).limit(20)).all()
+                    session.rollback()
+                    count("reads")
+                except OperationalError:
+                    session.rollback()
+                    count("errors")
+
+    def write(worker: int) -> None:
+        n = 0
+        with Session(engine) as session:
+            while not stop.is_set():
+                session.add(User(email=f"writer-{worker}-{n}@test.com"))
+                n += 1
+                try:
+                    session.commit()
+                    count("writes")
+                except OperationalError:
+                    session.rollback()
+                    count("errors")
+
+    threads = [threading.Thread(target=read) for _ in range(readers)]
+    threads += [threading.Thread(target=write, args=(i,)) for i in range(writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    return {key: value / duration for key, value in counters.items()}
+
+
+@cli.command()
+def main(
+    readers: int = typer.Option(4),
+    writers: int = typer.Option(2),
+    duration: float = typer.Option(5.0),
+    rows: int = typer.Option(10_000),
+) -> None:
+    """
+    Compare default rollback journal with pragmas from settings
+    """
+    for name, pragmas in [("default", None), ("tuned", get_sqlite_pragmas())]:
+        with tempfile.TemporaryDirectory() as directory:
+            engine = _create_engine(Path(directory) / "bench.sqlite", pragmas)
+            _seed(engine, rows)
+            result = _run(engine, readers, writers, duration)
+            engine.dispose()
+
+        typer.echo(
+            f"{name:>8}: {result['reads']:10.1f} reads/s "
+            f"{result['writes']:10.1f} writes/s {result['errors']:8.1f} errors/s"
+        )
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,329 @@
+"""
+Throughput of auth, token and CRUD hot paths, saved as JSON and compared with baseline
+
+    python -m benchmarks.suite --output baseline.json
+    python -m benchmarks.suite --baseline baseline.json --threshold 0.2
+
+Every result is in operations per second, so higher is better. Results slower
+than baseline by more than threshold are reported and exit with status 1
+"""
+import asyncio
+import json
+import platform
+import random
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import httpx
+import typer
+from fastapi_pagination import Params
+from sqlalchemy import create_engine, delete, func
+from sqlalchemy import select as sa_select
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import Session, SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import crud
+from config.asgi import init_app
+from config.db import (
+    get_async_database_url,
+    get_async_session,
+    get_session,
+    get_sqlite_pragmas,
+    install_sqlite_pragmas,
+)
+from config.pool import get_pool_options
+from config.settings import settings
+from core.hashing import configure_crypto_context, password_hasher
+from core.pagination import encode_cursor
+from core.token import Token, token_cache
+from models import User
+
+cli = typer.Typer()
+
+Results = dict[str, float]
+
+HTTP_PASSWORD = "password"
+SEED_CHUNK_SIZE = 100_000
+PAGE_SIZE = 50
+
+
+def _measure(func: Callable[[], Any], min_seconds: float) -> float:
+    """
+    Call func until min_seconds passed, at least once, return calls per second
+    """
+    calls = 0
+    started = time.perf_counter()
+    while True:
+        func()
+        calls += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            return calls / elapsed
+
+
+def _create_engine(directory: str) -> Engine:
+    url = f"sqlite:///{Path(directory) / 'bench.sqlite'}"
+    engine = create_engine(url, **get_pool_options(url))
+    install_sqlite_pragmas(engine, get_sqlite_pragmas())
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+def _seed_users(engine: Engine, rows: int) -> None:
+    """
+    Grow users table up to rows
+    """
+    with Session(engine) as session:
+        total = sa_select(func.count()).select_from(User)
+        count = session.execute(total).scalar_one()
+        for start in range(count, rows, SEED_CHUNK_SIZE):
+            stop = min(start + SEED_CHUNK_SIZE, rows)
+            crud.user.bulk_create(
+                session,
+                [{"email": f"user-{i}@test.com"} for i in range(start, stop)],
+                chunk_size=10_000,
+            )
+
+
+def bench_tokens(engine: Engine, min_seconds: float) -> Results:
+    with Session(engine) as session:
+        user = session.exec(select(User).limit(1)).one()
+        token = Token.generate_token_for_user(user)
+
+        def verify() -> None:
+            Token.get_user_from_string(token, session)
+            session.expunge_all()
+
+        results = {
+            "token.generate": _measure(
+                lambda: Token.generate_token_for_user(user), min_seconds
+            ),
+        }
+        maxsize = token_cache.maxsize
+        token_cache.maxsize = 0
+        try:
+            results["token.verify"] = _measure(verify, min_seconds)
+        finally:
+            token_cache.maxsize = maxsize
+        results["token.verify_cached"] = _measure(verify, min_seconds)
+        token_cache.clear()
+    return results
+
+
+def bench_hashing(rounds: list[int], min_seconds: float) -> Results:
+    results = {}
+    user = User(email="hashing@test.com")
+    try:
+        for value in rounds:
+            configure_crypto_context(rounds=value)
+            user.set_password(HTTP_PASSWORD)
+            results[f"hashing.hash.rounds_{value}"] = _measure(
+                lambda: User.hash_password(HTTP_PASSWORD), min_seconds
+            )
+            results[f"hashing.check.rounds_{value}"] = _measure(
+                lambda: user.check_password(HTTP_PASSWORD), min_seconds
+            )
+    finally:
+        configure_crypto_context()
+    return results
+
+
+def bench_crud(engine: Engine, rows: list[int], min_seconds: float) -> Results:
+    results = {}
+    for size in sorted(rows):
+        _seed_users(engine, size)
+        created = iter(range(size, size * 2))
+
+        with Session(engine) as session:
+
+            def create() -> None:
+                crud.user.create(session, {"email": f"new-{next(created)}@test.com"})
+
+            def get() -> None:
+                crud.user.get(session, random.randint(1, size))
+                session.expunge_all()
+
+            def paginate() -> None:
+                page = random.randint(1, size // PAGE_SIZE)
+                crud.user.paginate(
+                    session, Params(page=page, size=PAGE_SIZE), fields=fields
+                )
+
+            def cursor_paginate() -> None:
+                cursor = encode_cursor([random.randint(0, size - PAGE_SIZE)])
+                crud.user.cursor_paginate(
+                    session, cursor, size=PAGE_SIZE, fields=fields
+                )
+
+            fields = ["id", "email"]
+            results[f"crud.get.rows_{size}"] = _measure(get, min_seconds)
+            results[f"crud.paginate.rows_{size}"] = _measure(paginate, min_seconds)
+            results[f"crud.cursor_paginate.rows_{size}"] = _measure(
+                cursor_paginate, min_seconds
+            )
+            results[f"crud.create.rows_{size}"] = _measure(create, min_seconds)
+
+            # Remove created rows, so next size starts from exact row count
+            session.execute(delete(User).where(User.id > size))
+            session.commit()
+    return results
+
+
+async def _measure_async(
+    func: Callable[[], Any], requests: int, concurrency: int
+) -> float:
+    """
+    Send requests through concurrency workers, return requests per second
+    """
+    remaining = iter(range(requests))
+
+    async def worker() -> None:
+        for _ in remaining:
+            response = await func()
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return requests / (time.perf_counter() - started)
+
+
+async def _bench_http(
+    engine: Engine, requests: int, concurrency: int, rounds: int
+) -> Results:
+    async_url = get_async_database_url(str(engine.url))
+    async_engine = create_async_engine(
+        async_url, **get_pool_options(async_url, is_async=True)
+    )
+    install_sqlite_pragmas(async_engine.sync_engine, get_sqlite_pragmas())
+
+    def _get_session():
+        with Session(engine) as session:
+            yield session
+
+    async def _get_async_session():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield session
+
+    # All requests of in-process client come from the same address
+    rate_limit_enabled = settings.RATE_LIMIT_ENABLED
+    settings.RATE_LIMIT_ENABLED = False
+    try:
+        app = init_app()
+        app.dependency_overrides[get_session] = _get_session
+        app.dependency_overrides[get_async_session] = _get_async_session
+
+        configure_crypto_context(rounds=rounds)
+        with Session(engine) as session:
+            admin = crud.user.create(
+                session,
+                {
+                    "email": "admin@test.com",
+                    "password": User.hash_password(HTTP_PASSWORD),
+                    "is_admin": True,
+                },
+            )
+            token = Token.generate_token_for_user(admin)
+
+        login_data = {"email": "admin@test.com", "password": HTTP_PASSWORD}
+        headers = {"Authorization": f"Bearer {token}"}
+        async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+            return {
+                f"http.login.rounds_{rounds}": await _measure_async(
+                    lambda: client.post("/auth/login", json=login_data),
+                    requests,
+                    concurrency,
+                ),
+                "http.users": await _measure_async(
+                    lambda: client.get("/users/", headers=headers),
+                    requests,
+                    concurrency,
+                ),
+            }
+    finally:
+        settings.RATE_LIMIT_ENABLED = rate_limit_enabled
+        configure_crypto_context()
+        password_hasher.shutdown()
+        await async_engine.dispose()
+
+
+def bench_http(engine: Engine, requests: int, concurrency: int, rounds: int) -> Results:
+    return asyncio.run(_bench_http(engine, requests, concurrency, rounds))
+
+
+def compare(results: Results, baseline: Results, threshold: float) -> list[str]:
+    """
+    Names of results slower than baseline by more than threshold
+    """
+    return [
+        name
+        for name, value in results.items()
+        if name in baseline and value < baseline[name] * (1 - threshold)
+    ]
+
+
+def _format_row(name: str, value: float, baseline: Optional[float]) -> str:
+    row = f"{name:<32} {value:12.1f} ops/s"
+    if baseline:
+        row += f" {(value / baseline - 1) * 100:+7.1f}%"
+    return row
+
+
+@cli.command()
+def main(
+    rows: list[int] = typer.Option([1_000, 100_000, 1_000_000]),
+    rounds: list[int] = typer.Option([4, 10, 12]),
+    http_rounds: int = typer.Option(4, help="bcrypt rounds of login request"),
+    requests: int = typer.Option(1_000),
+    concurrency: int = typer.Option(10),
+    min_seconds: float = typer.Option(1.0),
+    output: Optional[Path] = typer.Option(None),
+    baseline: Optional[Path] = typer.Option(None),
+    threshold: float = typer.Option(0.2),
+) -> None:
+    """
+    Run benchmarks, print results and compare them with baseline
+    """
+    results: Results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        engine = _create_engine(directory)
+        _seed_users(engine, 1_000)
+        results |= bench_tokens(engine, min_seconds)
+        results |= bench_http(engine, requests, concurrency, http_rounds)
+        engine.dispose()
+    with tempfile.TemporaryDirectory() as directory:
+        engine = _create_engine(directory)
+        results |= bench_crud(engine, rows, min_seconds)
+        engine.dispose()
+    results |= bench_hashing(rounds, min_seconds)
+
+    baseline_results = json.loads(baseline.read_text())["results"] if baseline else {}
+    for name, value in results.items():
+        typer.echo(_format_row(name, value, baseline_results.get(name)))
+
+    if output is not None:
+        report = {
+            "created_at": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "database": "sqlite",
+            "settings": {
+                "password_hashing_executor": settings.PASSWORD_HASHING_EXECUTOR,
+                "metrics_enabled": settings.METRICS_ENABLED,
+            },
+            "results": results,
+        }
+        output.write_text(json.dumps(report, indent=2) + "\n")
+
+    regressions = compare(results, baseline_results, threshold)
+    if regressions:
+        typer.echo(f"Regressions over {threshold:.0%}: {', '.join(regressions)}")
+        raise typer.Exit(1)
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,81 @@
+"""
+Per request cost of Token.get_user_from_string by user lookup strategy
+
+    python -m benchmarks.token_auth --users 10000 --requests 5000
+"""
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import typer
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, SQLModel, select
+
+import crud
+from config.db import get_sqlite_pragmas, install_sqlite_pragmas
+from config.pool import get_pool_options
+from core.token import Token, token_cache
+from models import User
+
+cli = typer.Typer()
+
+
+def _make_tokens(users: list[User], mode: str) -> list[str]:
+    tokens = []
+    for user in users:
+        claims = Token.get_claims_from_string(Token.generate_token_for_user(user))
+        if mode == "email":
+            del claims["sub"]
+        if mode == "stateless":
+            claims["is_admin"] = user.is_admin
+        tokens.append(Token._encode(claims))
+    return tokens
+
+
+def _run(engine: Engine, tokens: list[str], mode: str) -> float:
+    Token.stateless = mode == "stateless"
+    token_cache.maxsize = 10_000 if mode == "cached" else 0
+    token_cache.clear()
+
+    started = time.perf_counter()
+    for token in tokens:
+        # Every request has its own session, like get_session dependency
+        with Session(engine) as session:
+            Token.get_user_from_string(token, session)
+    return time.perf_counter() - started
+
+
+@cli.command()
+def main(
+    users: int = typer.Option(10_000), requests: int = typer.Option(5_000)
+) -> None:
+    """
+    Print microseconds per authenticated request
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite:///{Path(directory) / 'bench.sqlite'}"
+        engine = create_engine(url, **get_pool_options(url))
+        install_sqlite_pragmas(engine, get_sqlite_pragmas())
+        SQLModel.metadata.create_all(engine)
+
+        with Session(engine) as session:
+            crud.user.bulk_create(
+                session, [{"email": f"user-{i}@test.com"} for i in range(users)]
+            )
+            all_users = session.exec(select(User)).all()
+        sample = random.choices(all_users, k=requests)
+
+        for mode in ["email", "id", "stateless", "cached"]:
+            tokens = _make_tokens(sample, mode)
+            if mode == "cached":
+                tokens = tokens[:100] * (requests // 100)
+            seconds = _run(engine, tokens, mode)
+            typer.echo(f"{mode:>9}: {seconds / len(tokens) * 1e6:8.1f}us per request")
+
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    cli()
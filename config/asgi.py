@@ -1,15 +1,62 @@
 from fastapi import FastAPI
 from fastapi.openapi.utils import get_openapi
 from fastapi_pagination import add_pagination
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
 
 from config import routers
 from config.settings import settings
+from core.hashing import password_hasher
+from core.known_emails import build_known_emails
+from core.metrics import MetricsMiddleware
+from core.profiling import ProfilingMiddleware
+from core.rate_limit import RateLimitMiddleware, RateLimitRule
+from core.renderers import get_default_response_class
+
+
+def get_rate_limit_rules() -> dict[str, RateLimitRule]:
+    """
+    Per IP limits of endpoints which hash passwords
+    """
+    rule = RateLimitRule(
+        settings.LOGIN_RATE_LIMIT_PER_IP, settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS
+    )
+    return {"/auth/login": rule, "/auth/register": rule}
 
 
 def init_app():
-    app = FastAPI(debug=settings.DEBUG)
+    app = FastAPI(
+        debug=settings.DEBUG, default_response_class=get_default_response_class()
+    )
     routers.init_app(app)
+    if settings.RATE_LIMIT_ENABLED:
+        app.add_middleware(RateLimitMiddleware, rules=get_rate_limit_rules())
+    if settings.PROFILING_ENABLED:
+        app.add_middleware(
+            ProfilingMiddleware,
+            directory=settings.PROFILING_DIR,
+            sample_rate=settings.PROFILING_SAMPLE_RATE,
+            # Anyone can send the header, so it's only honoured in debug
+            header=(
+                settings.PROFILING_HEADER
+                if settings.DEBUG and settings.PROFILING_HEADER_ENABLED
+                else None
+            ),
+            max_profiles=settings.PROFILING_MAX_PROFILES,
+        )
+    if settings.METRICS_ENABLED:
+        # Added after rate limit to wrap it, so rate limited requests are recorded too
+        app.add_middleware(MetricsMiddleware)
+    if settings.FORWARDED_ALLOW_IPS:
+        # Outermost, so rate limits see client IP instead of proxy's one
+        app.add_middleware(
+            ProxyHeadersMiddleware,
+            trusted_hosts=[
+                ip.strip() for ip in settings.FORWARDED_ALLOW_IPS.split(",")
+            ],
+        )
     add_pagination(app)
+    app.add_event_handler("startup", build_known_emails)
+    app.add_event_handler("shutdown", password_hasher.shutdown)
     return app
 
 
@@ -1,14 +1,106 @@
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from config.pool import get_pool_options
+from config.query_log import install_query_logging
 from config.settings import settings
+from core.metrics import install_query_metrics
+from core.profiling import install_query_capture
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+
+def get_async_database_url(database_url: str) -> str:
+    """
+    Return database url with async driver of the same backend
+    """
+    url = make_url(database_url)
+    if url.drivername not in ASYNC_DRIVERS:
+        return database_url
+    return str(url.set(drivername=ASYNC_DRIVERS[url.drivername]))
+
+
+def get_connect_args(database_url: str) -> dict[str, Any]:
+    if make_url(database_url).get_backend_name() == "sqlite":
+        return {"check_same_thread": False}
+    return {}
+
+
+def get_sqlite_pragmas() -> dict[str, Any]:
+    return {
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "cache_size": settings.SQLITE_CACHE_SIZE,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT,
+        "temp_store": settings.SQLITE_TEMP_STORE,
+    }
+
+
+def install_sqlite_pragmas(engine: Engine, pragmas: dict[str, Any]) -> None:
+    """
+    Apply pragmas to every new connection of SQLite engine
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or get_async_database_url(
+    settings.DATABASE_URL
+)
 
 engine = create_engine(
     settings.DATABASE_URL,
-    echo=settings.SQLALCHEMY_ECHO,
-    connect_args={"check_same_thread": False},
+    connect_args=get_connect_args(settings.DATABASE_URL),
+    **get_pool_options(settings.DATABASE_URL),
+)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    **get_pool_options(ASYNC_DATABASE_URL, is_async=True),
+)
+
+install_sqlite_pragmas(engine, get_sqlite_pragmas())
+install_sqlite_pragmas(async_engine.sync_engine, get_sqlite_pragmas())
+
+install_query_logging(
+    engine, settings.SQL_LOG_SAMPLE_RATE, settings.SQL_LOG_SLOW_THRESHOLD_MS
+)
+install_query_logging(
+    async_engine.sync_engine,
+    settings.SQL_LOG_SAMPLE_RATE,
+    settings.SQL_LOG_SLOW_THRESHOLD_MS,
 )
 
+if settings.METRICS_ENABLED:
+    install_query_metrics(engine)
+    install_query_metrics(async_engine.sync_engine)
+if settings.PROFILING_ENABLED:
+    install_query_capture(engine)
+    install_query_capture(async_engine.sync_engine)
+
 
 def get_session():
     with Session(engine) as session:
         yield session
+
+
+async def get_async_session():
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
@@ -0,0 +1,145 @@
+import threading
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import (
+    AsyncAdaptedQueuePool,
+    Pool,
+    QueuePool,
+    SingletonThreadPool,
+    StaticPool,
+)
+
+from config.settings import settings
+
+
+class PoolMetrics:
+    """
+    Counters of connection pool activity since pool creation
+    """
+
+    def __init__(self) -> None:
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self._lock = threading.Lock()
+
+    def on_connect(self, *args: Any) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def on_checkout(self, *args: Any) -> None:
+        with self._lock:
+            self.checkouts += 1
+
+    def on_checkin(self, *args: Any) -> None:
+        with self._lock:
+            self.checkins += 1
+
+    def on_invalidate(self, *args: Any) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def as_dict(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checked_out": self.checkouts - self.checkins,
+                "invalidations": self.invalidations,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max,
+            }
+
+
+class MeteredPoolMixin:
+    """
+    Collects PoolMetrics for the pool it's mixed into
+    """
+
+    metrics: PoolMetrics
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+        event.listen(self, "connect", self.metrics.on_connect)
+        event.listen(self, "checkout", self.metrics.on_checkout)
+        event.listen(self, "checkin", self.metrics.on_checkin)
+        event.listen(self, "invalidate", self.metrics.on_invalidate)
+
+    def connect(self) -> Any:
+        started = time.perf_counter()
+        try:
+            return super().connect()  # type: ignore[misc]
+        finally:
+            self.metrics.record_wait(time.perf_counter() - started)
+
+    def stats(self) -> dict[str, Any]:
+        stats = {"pool_class": type(self).__name__, **self.metrics.as_dict()}
+        if isinstance(self, QueuePool):
+            stats |= {
+                "size": self.size(),
+                "checked_in": self.checkedin(),
+                "overflow": self.overflow(),
+            }
+        return stats
+
+
+class MeteredQueuePool(MeteredPoolMixin, QueuePool):
+    pass
+
+
+class MeteredAsyncAdaptedQueuePool(MeteredPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+class MeteredSingletonThreadPool(MeteredPoolMixin, SingletonThreadPool):
+    pass
+
+
+class MeteredStaticPool(MeteredPoolMixin, StaticPool):
+    pass
+
+
+def get_pool_options(database_url: str, is_async: bool = False) -> dict[str, Any]:
+    """
+    Return create_engine pool arguments suitable for database backend
+    """
+    url = make_url(database_url)
+    options: dict[str, Any] = {
+        "pool_pre_ping": settings.DATABASE_POOL_PRE_PING,
+        "pool_recycle": settings.DATABASE_POOL_RECYCLE,
+    }
+
+    if url.get_backend_name() == "sqlite":
+        if url.database in (None, "", ":memory:"):
+            # In-memory database lives only as long as its single connection
+            return options | {"poolclass": MeteredStaticPool}
+        if not is_async:
+            return options | {
+                "poolclass": MeteredSingletonThreadPool,
+                "pool_size": settings.DATABASE_POOL_SIZE,
+            }
+
+    return options | {
+        "poolclass": MeteredAsyncAdaptedQueuePool if is_async else MeteredQueuePool,
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_POOL_MAX_OVERFLOW,
+        "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+    }
+
+
+def get_pool_stats(pool: Pool) -> dict[str, Any]:
+    if isinstance(pool, MeteredPoolMixin):
+        return pool.stats()
+    return {"pool_class": type(pool).__name__}
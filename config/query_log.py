@@ -0,0 +1,65 @@
+import json
+import logging
+import random
+import time
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("sql.queries")
+
+
+def _get_param_count(parameters: Any, executemany: bool) -> int:
+    if executemany:
+        parameters = parameters[0] if parameters else ()
+    return len(parameters) if parameters else 0
+
+
+def install_query_logging(
+    engine: Engine, sample_rate: float, slow_threshold_ms: Optional[float]
+) -> None:
+    """
+    Log sampled and slow statements of the engine as JSON lines
+    Nothing is installed when both sampling and slow query logging are off
+    Sampled statements are logged with INFO and slow ones with WARNING level,
+    handlers and levels of "sql.queries" logger are up to logging configuration,
+    records aren't built for levels it doesn't enable
+    """
+    if sample_rate <= 0 and slow_threshold_ms is None:
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ) -> None:
+        sampled = logger.isEnabledFor(logging.INFO) and (
+            sample_rate >= 1 or random.random() < sample_rate
+        )
+        if sampled or slow_threshold_ms is not None:
+            context._query_log = (sampled, time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ) -> None:
+        query_log = getattr(context, "_query_log", None)
+        if query_log is None:
+            return
+
+        sampled, started = query_log
+        duration_ms = (time.perf_counter() - started) * 1000
+        slow = slow_threshold_ms is not None and duration_ms >= slow_threshold_ms
+        level = logging.WARNING if slow else logging.INFO
+        if not (sampled or slow) or not logger.isEnabledFor(level):
+            return
+
+        record = {
+            "event": "sql_query",
+            "statement": statement,
+            "duration_ms": round(duration_ms, 3),
+            "param_count": _get_param_count(parameters, executemany),
+            "executemany": executemany,
+            "slow": slow,
+        }
+        logger.log(level, json.dumps(record, separators=(",", ":")))
@@ -1,9 +1,17 @@
 from fastapi import FastAPI
 
 from auth.routes import router as auth_router
+from auth.routes import well_known_router
+from config.settings import settings
+from monitoring.routes import metrics_router
+from monitoring.routes import router as monitoring_router
 from user.routes import router as user_router
 
 
 def init_app(app: FastAPI):
     app.include_router(auth_router, prefix="/auth")
+    app.include_router(well_known_router, prefix="/.well-known")
     app.include_router(user_router, prefix="/users")
+    app.include_router(monitoring_router, prefix="/monitoring")
+    if settings.METRICS_ENABLED:
+        app.include_router(metrics_router)
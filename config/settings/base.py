@@ -1,14 +1,77 @@
+from typing import Literal, Optional
+
 from pydantic import BaseSettings
 
 
 class Settings(BaseSettings):
     DATABASE_URL: str
-    SQLALCHEMY_ECHO: bool = True
+    ASYNC_DATABASE_URL: Optional[str] = None
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_POOL_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: float = 30
+    DATABASE_POOL_RECYCLE: int = 1800
+    DATABASE_POOL_PRE_PING: bool = True
+
+    SQLITE_JOURNAL_MODE: Literal["DELETE", "TRUNCATE", "PERSIST", "WAL"] = "WAL"
+    SQLITE_SYNCHRONOUS: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE: int = -64 * 1024  # negative value is size in KiB
+    SQLITE_BUSY_TIMEOUT: int = 5000  # milliseconds
+    SQLITE_TEMP_STORE: Literal["DEFAULT", "FILE", "MEMORY"] = "MEMORY"
+    SQL_LOG_SAMPLE_RATE: float = 0.0
+    SQL_LOG_SLOW_THRESHOLD_MS: Optional[float] = None
 
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+    ACCESS_TOKEN_STATELESS: bool = False
+    # Disable once tokens issued without sub claim have expired
+    TOKEN_EMAIL_FALLBACK: bool = True
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
+    JWT_KEYS_DIR: Optional[str] = None
+    JWT_ACTIVE_KID: Optional[str] = None
+    JWKS_CACHE_MAX_AGE: int = 3600
+    TOKEN_CACHE_SIZE: int = 10000
+    TOKEN_CACHE_TTL_SECONDS: int = 300
+    REVOCATION_BLOOM_CAPACITY: int = 100_000
+    REVOCATION_BLOOM_ERROR_RATE: float = 0.001
+    REVOCATION_RECENT_SIZE: int = 10_000
+    REVOCATION_REFRESH_SECONDS: float = 5
+    REVOCATION_REFRESH_OVERLAP: int = 1000
+    REVOCATION_PRUNE_SECONDS: float = 3600
     PASSWORD_HASHING_SCHEME: str = "bcrypt"
+    PASSWORD_HASHING_ROUNDS: Optional[int] = None
+    PASSWORD_HASHING_EXECUTOR: Literal["process", "thread"] = "process"
+    PASSWORD_HASHING_WORKERS: int = 4
+    PASSWORD_HASHING_QUEUE_SIZE: int = 64
+
+    KNOWN_EMAILS_FILTER: bool = True
+    KNOWN_EMAILS_CAPACITY: int = 1_000_000
+    KNOWN_EMAILS_ERROR_RATE: float = 0.001
+    KNOWN_EMAILS_REFRESH_SECONDS: float = 5
+    KNOWN_EMAILS_REFRESH_OVERLAP_SECONDS: float = 60
+    KNOWN_EMAILS_REBUILD_SECONDS: float = 3600
+    LOGIN_TIMING_POLICY: Literal["none", "delay", "dummy_hash"] = "delay"
+
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_SHARDS: int = 16
+    LOGIN_RATE_LIMIT_PER_IP: int = 30
+    LOGIN_RATE_LIMIT_PER_ACCOUNT: int = 5
+    LOGIN_RATE_LIMIT_WINDOW_SECONDS: int = 60
+    # Comma separated proxy IPs, or "*", whose X-Forwarded-For is trusted as client
+    # IP; behind a proxy without it all clients share rate limit of proxy's IP
+    FORWARDED_ALLOW_IPS: Optional[str] = None
+
+    ORJSON_RESPONSE: bool = False
+
+    METRICS_ENABLED: bool = False
+    PROFILING_ENABLED: bool = False
+    PROFILING_SAMPLE_RATE: float = 0.0
+    # Anyone can profile requests with this header, enable it only in development
+    PROFILING_HEADER_ENABLED: bool = False
+    PROFILING_HEADER: str = "X-Profile"
+    PROFILING_DIR: str = "./profiles"
+    PROFILING_MAX_PROFILES: int = 100
 
     DEBUG: bool = True
 
@@ -0,0 +1,98 @@
+import hashlib
+import math
+import threading
+import time
+from typing import Any, Iterable, Sequence
+
+
+class BloomFilter:
+    """
+    Set membership with false positives, but no false negatives
+    Size is chosen for given capacity and false positive rate
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str) -> Iterable[int]:
+        # Double hashing: positions are h1 + i * h2 of two halves of one digest
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+
+class BloomIndex:
+    """
+    Bloom filter of keys of a table kept in process, refreshed incrementally
+    by column which grows with new rows, e.g. id
+    Rows may commit out of order, e.g. PostgreSQL takes sequence ids before
+    commit, so each refresh reads again rows within refresh_overlap below the
+    highest value seen, reading a key twice is harmless
+    """
+
+    def __init__(
+        self,
+        *,
+        capacity: int,
+        error_rate: float,
+        refresh_interval: float,
+        refresh_overlap: Any,
+    ):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh_interval = refresh_interval
+        self.refresh_overlap = refresh_overlap
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._bloom = BloomFilter(self.capacity, self.error_rate)
+            self._last: Any = None
+            self._refreshed_at = 0.0
+
+    def _add(self, key: str, value: Any) -> None:
+        """
+        Add key, called with lock held
+        """
+        self._bloom.add(key)
+        if value is not None:
+            self._last = value if self._last is None else max(self._last, value)
+
+    def add(self, key: str, value: Any = None) -> None:
+        with self._lock:
+            self._add(key, value)
+
+    def load(self, rows: Iterable[Sequence[Any]]) -> None:
+        """
+        Add keys of (value, key) rows
+        """
+        for value, key in rows:
+            self.add(key, value)
+
+    @property
+    def needs_refresh(self) -> bool:
+        return time.monotonic() - self._refreshed_at >= self.refresh_interval
+
+    def _start_refresh(self) -> Any:
+        """
+        Mark refresh as started, return value above which rows have to be read,
+        or None if all of them have to
+        """
+        self._refreshed_at = time.monotonic()
+        if self._last is None:
+            return None
+        return self._last - self.refresh_overlap
@@ -36,3 +36,19 @@ class PermissionDeniedError(_HTTPException):
     status_code = status.HTTP_403_FORBIDDEN
     detail = "Permission denied"
     headers = {"WWW-Authenticate": "Bearer"}
+
+
+class NotFoundError(_HTTPException):
+    status_code = status.HTTP_404_NOT_FOUND
+    detail = "Not found"
+
+
+class TooManyRequestsError(_HTTPException):
+    status_code = status.HTTP_429_TOO_MANY_REQUESTS
+    detail = "Too many requests"
+
+
+class ServiceUnavailableError(_HTTPException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    detail = "Service is temporarily overloaded"
+    headers = {"Retry-After": "1"}
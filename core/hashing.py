@@ -0,0 +1,165 @@
+import asyncio
+import time
+from concurrent import futures
+from typing import Any, Callable, Optional, TypeVar
+
+from passlib.context import CryptContext
+from passlib.exc import UnknownHashError
+
+from config.settings import settings
+
+T = TypeVar("T")
+
+crypto_context = CryptContext()
+# Arguments of the last configure_crypto_context call, passed to hashing processes
+crypto_config: tuple[str, Optional[int]] = (settings.PASSWORD_HASHING_SCHEME, None)
+
+
+def configure_crypto_context(
+    schemes: str = settings.PASSWORD_HASHING_SCHEME,
+    rounds: Optional[int] = settings.PASSWORD_HASHING_ROUNDS,
+) -> None:
+    """
+    (Re)configure password hashing context of current process
+    Hashes made with deprecated schemes or fewer rounds are marked as needing update
+    Password hashing pool picks up new configuration on its next call
+    """
+    global crypto_config
+    config: dict[str, Any] = {"schemes": schemes, "deprecated": "auto"}
+    if rounds is not None:
+        default_scheme = schemes.split(",")[0].strip()
+        config[f"{default_scheme}__default_rounds"] = rounds
+        config[f"{default_scheme}__min_rounds"] = rounds
+
+    crypto_context.load(config)
+    crypto_config = (schemes, rounds)
+
+
+configure_crypto_context()
+
+
+def hash_password(password_string: str) -> str:
+    return crypto_context.hash(password_string)
+
+
+def verify_and_update_password(
+    password_string: str, password_hash: Optional[str]
+) -> tuple[bool, Optional[str]]:
+    """
+    Check password and return new hash if stored one needs update
+    """
+    try:
+        return crypto_context.verify_and_update(password_string, password_hash)
+    except UnknownHashError:
+        return False, None
+
+
+def _timed_call(func: Callable[..., T], *args: Any) -> tuple[float, T]:
+    """
+    Call func in pool worker, return seconds it took without waiting in queue
+    """
+    started = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - started, result
+
+
+class PasswordHasherBusyError(Exception):
+    pass
+
+
+class PasswordHasher:
+    """
+    Runs password hashing in a dedicated bounded pool, so slow hashes
+    don't occupy event loop or threadpool used by other endpoints
+    """
+
+    def __init__(self, *, workers: int, queue_size: int, use_processes: bool):
+        self.workers = workers
+        self.max_pending = workers + queue_size
+        self.use_processes = use_processes
+        self._pending = 0
+        self._executor: Optional[futures.Executor] = None
+        self._executor_config: Optional[tuple[str, Optional[int]]] = None
+        # Moving average of call duration in worker, without time spent in queue
+        self.average_seconds: Optional[float] = None
+
+    @property
+    def executor(self) -> futures.Executor:
+        """
+        Pool of workers, worker processes have their own crypto_context,
+        so pool is restarted with new configuration once it changes
+        """
+        if self._executor is not None and self._executor_config != crypto_config:
+            # Calls already submitted to old pool still finish
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+        if self._executor is None:
+            if self.use_processes:
+                self._executor = futures.ProcessPoolExecutor(
+                    self.workers,
+                    initializer=configure_crypto_context,
+                    initargs=crypto_config,
+                )
+            else:
+                self._executor = futures.ThreadPoolExecutor(self.workers)
+            self._executor_config = crypto_config
+        return self._executor
+
+    def _admit(self) -> None:
+        if self._pending >= self.max_pending:
+            raise PasswordHasherBusyError("Too many pending password hashing calls")
+
+    def estimate_seconds(self) -> Optional[float]:
+        """
+        Expected duration of call submitted now, including wait in queue
+        """
+        if self.average_seconds is None:
+            return None
+        # Pending calls are served before this one, workers at a time
+        return self.average_seconds * (self._pending // self.workers + 1)
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Run func in the pool, fail fast when too many calls are pending
+        """
+        self._admit()
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            duration, result = await loop.run_in_executor(
+                self.executor, _timed_call, func, *args
+            )
+        finally:
+            self._pending -= 1
+
+        if self.average_seconds is None:
+            self.average_seconds = duration
+        else:
+            self.average_seconds = 0.9 * self.average_seconds + 0.1 * duration
+        return result
+
+    async def sleep(self) -> None:
+        """
+        Take as long as call submitted now would, without using the pool
+        Admission and pending count are the same as for run, so a sleeping
+        caller can't be told from a hashing one by response time or status
+        """
+        self._admit()
+        self._pending += 1
+        try:
+            await asyncio.sleep(self.estimate_seconds() or 0)
+        finally:
+            self._pending -= 1
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASHING_WORKERS,
+    queue_size=settings.PASSWORD_HASHING_QUEUE_SIZE,
+    use_processes=settings.PASSWORD_HASHING_EXECUTOR == "process",
+)
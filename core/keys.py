@@ -0,0 +1,85 @@
+from pathlib import Path
+from typing import Any, NamedTuple, Optional
+
+from jose import jwk
+from jose.backends.base import Key
+
+from config.settings import settings
+
+ASYMMETRIC_ALGORITHMS = {"RS256", "RS384", "RS512", "ES256", "ES384", "ES512"}
+
+
+class SigningKey(NamedTuple):
+    kid: str
+    algorithm: str
+    key: Key
+
+    @property
+    def can_sign(self) -> bool:
+        return not self.key.is_public()
+
+    @property
+    def public_key(self) -> Key:
+        return self.key if self.key.is_public() else self.key.public_key()
+
+    def public_jwk(self) -> dict[str, Any]:
+        return self.public_key.to_dict() | {"kid": self.kid, "use": "sig"}
+
+
+class KeyRing:
+    """
+    Keys used to sign and verify tokens, looked up by kid header
+    Active key signs new tokens, retiring keys only verify tokens issued before
+    rotation, so rotation doesn't invalidate sessions
+    """
+
+    def __init__(self, keys: list[SigningKey], active_kid: str):
+        self._keys = {key.kid: key for key in keys}
+        if active_kid not in self._keys or not self._keys[active_kid].can_sign:
+            raise ValueError(f"Active key {active_kid} has no private key")
+
+        self.active = self._keys[active_kid]
+        self._jwks = {
+            "keys": [self.active.public_jwk()]
+            + [key.public_jwk() for key in keys if key.kid != active_kid]
+        }
+
+    def get(self, kid: Optional[str]) -> Optional[SigningKey]:
+        return self._keys.get(kid) if kid is not None else None
+
+    def jwks(self) -> dict[str, Any]:
+        return self._jwks
+
+
+def load_key_ring(directory: Path, active_kid: str, algorithm: str) -> KeyRing:
+    """
+    Load every <kid>.pem file of directory, private keys can sign, public keys
+    (e.g. retired keys which private part was destroyed) can only verify
+    """
+    if algorithm not in ASYMMETRIC_ALGORITHMS:
+        raise ValueError(f"Algorithm {algorithm} is not supported for key ring")
+
+    keys = [
+        SigningKey(path.stem, algorithm, jwk.construct(path.read_text(), algorithm))
+        for path in sorted(directory.glob("*.pem"))
+    ]
+    return KeyRing(keys, active_kid)
+
+
+def get_key_ring() -> Optional[KeyRing]:
+    """
+    Key ring for asymmetric ALGORITHM, None when tokens are signed with SECRET_KEY
+    """
+    if settings.ALGORITHM not in ASYMMETRIC_ALGORITHMS:
+        return None
+    if not settings.JWT_KEYS_DIR or not settings.JWT_ACTIVE_KID:
+        raise ValueError(
+            f"JWT_KEYS_DIR and JWT_ACTIVE_KID are required for {settings.ALGORITHM}"
+        )
+
+    return load_key_ring(
+        Path(settings.JWT_KEYS_DIR), settings.JWT_ACTIVE_KID, settings.ALGORITHM
+    )
+
+
+key_ring = get_key_ring()
@@ -0,0 +1,105 @@
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+from sqlalchemy import select as sa_select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import Select
+
+from config.db import async_engine
+from config.settings import settings
+from core.bloom import BloomIndex
+from models import User
+
+BUILD_BATCH_SIZE = 10_000
+
+
+class KnownEmails(BloomIndex):
+    """
+    Bloom filter of registered emails, so logins of unknown emails skip database
+    Until filter is built every email is treated as possibly registered
+    Emails registered or changed by other processes are picked up by incremental
+    refresh by users.updated_at, so refresh_overlap has to cover clock
+    difference between app servers too. Deleted emails stay in filter until it
+    is rebuilt every rebuild_interval and are only answered by database
+    """
+
+    def __init__(
+        self,
+        *,
+        capacity: int,
+        error_rate: float,
+        refresh_interval: float,
+        refresh_overlap: timedelta,
+        rebuild_interval: float,
+    ):
+        self.rebuild_interval = rebuild_interval
+        self._built_at = 0.0
+        super().__init__(
+            capacity=capacity,
+            error_rate=error_rate,
+            refresh_interval=refresh_interval,
+            refresh_overlap=refresh_overlap,
+        )
+
+    def clear(self) -> None:
+        super().clear()
+        self.is_built = False
+
+    def might_exist(self, email: str) -> bool:
+        if not self.is_built:
+            return True
+        with self._lock:
+            return email in self._bloom
+
+    @property
+    def needs_rebuild(self) -> bool:
+        return time.monotonic() - self._built_at >= self.rebuild_interval
+
+    def get_refresh_query(self) -> Select[tuple[datetime, str]]:
+        query = select(User.updated_at, User.email)
+        updated_at = self._start_refresh()
+        if updated_at is not None:
+            query = query.where(User.updated_at > updated_at)
+        return query
+
+    async def build_async(self, session: AsyncSession) -> None:
+        """
+        Fill filter with all registered emails, sized for their count
+        """
+        # Set first, so concurrent requests don't start another rebuild
+        self._built_at = time.monotonic()
+        total = sa_select(func.count()).select_from(User)
+        count: int = (await session.execute(total)).scalar_one()
+        self.capacity = max(self.capacity, count * 2)
+        self.clear()
+
+        query = self.get_refresh_query().execution_options(yield_per=BUILD_BATCH_SIZE)
+        rows = await session.stream(query)
+        while partition := await rows.fetchmany(BUILD_BATCH_SIZE):
+            self.load(partition)
+        self.is_built = True
+
+    async def might_exist_async(self, session: AsyncSession, email: str) -> bool:
+        if self.is_built and self.needs_rebuild:
+            await self.build_async(session)
+        elif self.is_built and self.needs_refresh:
+            rows = await session.execute(self.get_refresh_query())
+            self.load(rows)
+        return self.might_exist(email)
+
+
+known_emails = KnownEmails(
+    capacity=settings.KNOWN_EMAILS_CAPACITY,
+    error_rate=settings.KNOWN_EMAILS_ERROR_RATE,
+    refresh_interval=settings.KNOWN_EMAILS_REFRESH_SECONDS,
+    refresh_overlap=timedelta(seconds=settings.KNOWN_EMAILS_REFRESH_OVERLAP_SECONDS),
+    rebuild_interval=settings.KNOWN_EMAILS_REBUILD_SECONDS,
+)
+
+
+async def build_known_emails() -> None:
+    if settings.KNOWN_EMAILS_FILTER:
+        async with AsyncSession(async_engine) as session:
+            await known_emails.build_async(session)
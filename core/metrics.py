@@ -0,0 +1,290 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Optional, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config.settings import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = tuple[str, ...]
+
+
+class _ThreadShards:
+    """
+    Values of a metric split by thread, each thread only writes its own shard,
+    so recording needs no lock, locks are only taken to register a new thread
+    """
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self._shards: list[dict[Labels, Any]] = []
+        self._lock = threading.Lock()
+
+    def get(self) -> dict[Labels, Any]:
+        try:
+            return self._local.values
+        except AttributeError:
+            values: dict[Labels, Any] = {}
+            with self._lock:
+                self._shards.append(values)
+            self._local.values = values
+            return values
+
+    def all(self) -> list[dict[Labels, Any]]:
+        with self._lock:
+            return list(self._shards)
+
+    def clear(self) -> None:
+        for shard in self.all():
+            shard.clear()
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metric:
+    type: str
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.enabled = True
+        self._shards = _ThreadShards()
+
+    def clear(self) -> None:
+        self._shards.clear()
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram: "Histogram", labels: Labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self) -> None:
+        self.started = time.perf_counter()
+
+    def __exit__(self, *args: Any) -> None:
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels: str) -> None:
+        if not self.enabled:
+            return
+        values = self._shards.get()
+        entry = values.get(labels)
+        if entry is None:
+            # Bucket counts, the last one is +Inf, followed by sum of values
+            entry = values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        entry[bisect_left(self.buckets, value)] += 1
+        entry[-1] += value
+
+    def time(self, *labels: str) -> _Timer:
+        """
+        Context manager observing duration of its block in seconds
+        """
+        return _Timer(self, labels)
+
+    def collect(self) -> dict[Labels, list[float]]:
+        totals: dict[Labels, list[float]] = {}
+        for shard in self._shards.all():
+            for labels, entry in list(shard.items()):
+                total = totals.setdefault(labels, [0] * len(entry))
+                for index, value in enumerate(entry):
+                    total[index] += value
+        return totals
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        bucket_names = self.labelnames + ("le",)
+        for labels, entry in sorted(self.collect().items()):
+            cumulative = 0
+            bounds = [str(bucket) for bucket in self.buckets] + ["+Inf"]
+            for bound, count in zip(bounds, entry):
+                cumulative += int(count)
+                bucket_labels = _format_labels(bucket_names, labels + (bound,))
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            labels_string = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{labels_string} {entry[-1]}")
+            lines.append(f"{self.name}_count{labels_string} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._metrics: list[Metric] = []
+
+    def _register(self, metric: Metric) -> Any:
+        metric.enabled = self.enabled
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def set_enabled(self, enabled: bool) -> None:
+        self.enabled = enabled
+        for metric in self._metrics:
+            metric.enabled = enabled
+
+    def clear(self) -> None:
+        for metric in self._metrics:
+            metric.clear()
+
+    def render(self) -> str:
+        """
+        Metrics in Prometheus text exposition format
+        """
+        lines = [line for metric in self._metrics for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry(enabled=settings.METRICS_ENABLED)
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "Duration of HTTP requests by route template",
+    ("method", "route", "status"),
+)
+http_request_db_queries = registry.histogram(
+    "http_request_db_queries",
+    "Number of SQL statements executed by HTTP request",
+    ("method", "route"),
+    buckets=QUERY_COUNT_BUCKETS,
+)
+http_request_db_duration = registry.histogram(
+    "http_request_db_duration_seconds",
+    "Time spent executing SQL statements by HTTP request",
+    ("method", "route"),
+)
+password_hashing_duration = registry.histogram(
+    "password_hashing_duration_seconds",
+    "Duration of password hashing and verification",
+    ("operation",),
+)
+jwt_duration = registry.histogram(
+    "jwt_duration_seconds",
+    "Duration of JWT encoding and decoding",
+    ("operation",),
+)
+
+
+class _RequestStats:
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+# Shared with threadpool and greenlets running the request, which copy context
+_request_stats: ContextVar[Optional[_RequestStats]] = ContextVar(
+    "request_stats", default=None
+)
+
+
+def install_query_metrics(engine: Engine) -> None:
+    """
+    Count statements of the engine executed while serving HTTP request
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ) -> None:
+        if _request_stats.get() is not None:
+            context._metrics_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ) -> None:
+        stats = _request_stats.get()
+        started = getattr(context, "_metrics_started", None)
+        if stats is None or started is None:
+            return
+        stats.queries += 1
+        stats.db_seconds += time.perf_counter() - started
+
+
+def _get_route(scope: Scope) -> str:
+    route = scope.get("route")
+    # Raw paths of unmatched requests would make label values unbounded
+    return getattr(route, "path", "<unmatched>")
+
+
+class MetricsMiddleware:
+    """
+    Record latency and SQL statements of HTTP requests by route template
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def _send(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        stats = _RequestStats()
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            duration = time.perf_counter() - started
+            _request_stats.reset(token)
+
+            method, route = scope["method"], _get_route(scope)
+            http_request_duration.observe(duration, method, route, str(status))
+            http_request_db_queries.observe(stats.queries, method, route)
+            http_request_db_duration.observe(stats.db_seconds, method, route)
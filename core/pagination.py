@@ -0,0 +1,41 @@
+import base64
+import json
+from typing import Any, Generic, Optional, Sequence, TypeVar
+
+from pydantic.generics import GenericModel
+
+T = TypeVar("T")
+
+
+class CursorPage(GenericModel, Generic[T]):
+    items: Sequence[T]
+    next_cursor: Optional[str]
+
+
+def encode_cursor(values: list[Any]) -> str:
+    """
+    Encode values of the last row into opaque cursor string
+    """
+    data = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(data).decode()
+
+
+CURSOR_VALUE_TYPES = (str, int, float, bool, type(None))
+
+
+def decode_cursor(cursor: str, size: int) -> list[Any]:
+    """
+    Decode cursor string back into values of size columns
+    Only scalar values are accepted, anything else can't be compared with columns
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    if not all(isinstance(value, CURSOR_VALUE_TYPES) for value in values):
+        raise ValueError("Invalid cursor")
+
+    return values
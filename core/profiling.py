@@ -0,0 +1,172 @@
+import cProfile
+import io
+import pstats
+import random
+import time
+import uuid
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+PROFILE_STATS_LIMIT = 50
+
+# Statements of profiled request, None when current request isn't profiled
+_captured_queries: ContextVar[Optional[list[tuple[str, float]]]] = ContextVar(
+    "captured_queries", default=None
+)
+
+
+def install_query_capture(engine: Engine) -> None:
+    """
+    Collect statements of the engine executed while profiling request
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ) -> None:
+        if _captured_queries.get() is not None:
+            context._profiling_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ) -> None:
+        queries = _captured_queries.get()
+        started = getattr(context, "_profiling_started", None)
+        if queries is None or started is None:
+            return
+        queries.append((statement, (time.perf_counter() - started) * 1000))
+
+
+def _format_report(
+    scope: Scope,
+    duration: float,
+    profile: cProfile.Profile,
+    queries: list[tuple[str, float]],
+    concurrent: int,
+) -> str:
+    buffer = io.StringIO()
+    buffer.write(f"{scope['method']} {scope['path']} {duration * 1000:.3f}ms\n\n")
+    buffer.write(f"Concurrent requests: {concurrent}\n")
+    if concurrent:
+        buffer.write("Functions below include ones of concurrent requests\n")
+    buffer.write("\n")
+    buffer.write(f"SQL statements: {len(queries)}\n")
+    for statement, duration_ms in queries:
+        buffer.write(f"{duration_ms:.3f}ms {statement}\n")
+    buffer.write("\n")
+
+    stats = pstats.Stats(profile, stream=buffer)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(PROFILE_STATS_LIMIT)
+    return buffer.getvalue()
+
+
+class ProfilingMiddleware:
+    """
+    Profile sampled requests, or requests with header when it's given
+    Each profile is written to directory as <name>.prof, readable by pstats
+    or snakeviz, and <name>.txt with SQL statements and top functions,
+    name is returned in the same header of response
+    Only max_profiles latest profiles are kept, older ones are deleted
+    cProfile only sees the event loop thread, so sync dependencies running in
+    threadpool show up as awaiting, and only one request is profiled at a time
+    cProfile also sees other requests handled by event loop meanwhile, their
+    count is written to report, so mixed profiles can be told apart
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        directory: str,
+        sample_rate: float = 0.0,
+        header: Optional[str] = None,
+        max_profiles: int = 100,
+    ):
+        self.app = app
+        self.directory = Path(directory)
+        self.sample_rate = sample_rate
+        self.header = header.lower().encode() if header else None
+        self.max_profiles = max_profiles
+        self._active = False
+        # Requests being handled, and ones overlapping with profiled request
+        self._in_flight = 0
+        self._concurrent = 0
+
+    def _should_profile(self, scope: Scope) -> bool:
+        if self._active:
+            return False
+        if self.header is not None:
+            if any(name == self.header for name, _ in scope["headers"]):
+                return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if not self._should_profile(scope):
+            if self._active:
+                self._concurrent += 1
+            self._in_flight += 1
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                self._in_flight -= 1
+            return
+
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        header = (self.header or b"x-profile", name.encode())
+
+        async def _send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), header]
+            await send(message)
+
+        self._active = True
+        self._concurrent = self._in_flight
+        self._in_flight += 1
+        queries: list[tuple[str, float]] = []
+        token = _captured_queries.set(queries)
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        profile.enable()
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            profile.disable()
+            duration = time.perf_counter() - started
+            _captured_queries.reset(token)
+            self._active = False
+            self._in_flight -= 1
+            await run_in_threadpool(
+                self._write, name, scope, duration, profile, queries, self._concurrent
+            )
+
+    def _write(
+        self,
+        name: str,
+        scope: Scope,
+        duration: float,
+        profile: cProfile.Profile,
+        queries: list[tuple[str, float]],
+        concurrent: int,
+    ) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        profile.dump_stats(self.directory / f"{name}.prof")
+        report = _format_report(scope, duration, profile, queries, concurrent)
+        (self.directory / f"{name}.txt").write_text(report)
+        self._delete_old_profiles()
+
+    def _delete_old_profiles(self) -> None:
+        profiles = sorted(
+            self.directory.glob("*.prof"), key=lambda path: path.stat().st_mtime_ns
+        )
+        for path in profiles[: max(len(profiles) - self.max_profiles, 0)]:
+            path.unlink(missing_ok=True)
+            path.with_suffix(".txt").unlink(missing_ok=True)
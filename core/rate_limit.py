@@ -0,0 +1,190 @@
+import json
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Awaitable, Callable, NamedTuple, Optional
+
+from fastapi import Request
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from config.settings import settings
+from core.exceptions import TooManyRequestsError
+
+# Longest valid email address, longer keys are cut so they can't bloat memory
+EMAIL_KEY_MAX_LENGTH = 254
+
+
+class _Window(NamedTuple):
+    number: int
+    current: int
+    previous: int
+
+
+class RateLimitBackend(ABC):
+    """
+    Storage of request counters, shared by all workers which use the same store
+    """
+
+    @abstractmethod
+    async def hit(self, key: str, limit: int, window: int) -> float:
+        """
+        Count request of key, return 0 if it's allowed
+        or seconds to wait before retrying if limit is exceeded
+        """
+
+    @abstractmethod
+    def clear(self) -> None:
+        pass
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    Sliding window counters kept in process memory
+    Counters are split between shards with own locks, so threads rarely wait
+    for each other. Window is estimated from current and previous fixed windows.
+    Each shard keeps at most max_keys_per_shard keys, least recently hit
+    key is evicted first
+    """
+
+    def __init__(self, shards: int = 16, max_keys_per_shard: int = 10_000):
+        self.max_keys_per_shard = max_keys_per_shard
+        self._shards: list[OrderedDict[str, _Window]] = [
+            OrderedDict() for _ in range(shards)
+        ]
+        self._locks = [threading.Lock() for _ in range(shards)]
+
+    async def hit(self, key: str, limit: int, window: int) -> float:
+        now = time.time()
+        number, offset = divmod(now, window)
+        number = int(number)
+
+        shard_index = hash(key) % len(self._shards)
+        shard = self._shards[shard_index]
+        with self._locks[shard_index]:
+            entry = shard.pop(key, None)
+            if entry is None or entry.number < number - 1:
+                entry = _Window(number, 0, 0)
+            elif entry.number == number - 1:
+                entry = _Window(number, 0, entry.current)
+
+            weight = 1 - offset / window
+            if entry.previous * weight + entry.current >= limit:
+                shard[key] = entry
+                return math.ceil(window - offset)
+
+            shard[key] = entry._replace(current=entry.current + 1)
+            if len(shard) > self.max_keys_per_shard:
+                shard.popitem(last=False)
+
+        return 0
+
+    def clear(self) -> None:
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                shard.clear()
+
+
+rate_limit_backend: RateLimitBackend = MemoryRateLimitBackend(
+    shards=settings.RATE_LIMIT_SHARDS
+)
+
+
+class RateLimitRule(NamedTuple):
+    limit: int
+    window: int
+
+
+def _get_client_ip(scope: Scope) -> str:
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class RateLimitMiddleware:
+    """
+    Limit requests per client IP to given paths
+    Rejected requests are answered here, before routing, body parsing or
+    any dependency is executed
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        rules: dict[str, RateLimitRule],
+        backend: Optional[RateLimitBackend] = None,
+    ):
+        self.app = app
+        self.rules = rules
+        self.backend = backend
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        rule = self.rules.get(scope["path"]) if scope["type"] == "http" else None
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        backend = self.backend or rate_limit_backend
+        key = f"ip:{scope['path']}:{_get_client_ip(scope)}"
+        retry_after = await backend.hit(key, rule.limit, rule.window)
+        if not retry_after:
+            await self.app(scope, receive, send)
+            return
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": TooManyRequestsError.status_code,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"retry-after", str(int(retry_after)).encode()),
+                ],
+            }
+        )
+        body = json.dumps({"detail": TooManyRequestsError.detail})
+        await send({"type": "http.response.body", "body": body.encode()})
+
+
+class RateLimit:
+    """
+    Dependency limiting requests per key, e.g. per account
+    Requests which key can't be determined are not limited,
+    nor any request when RATE_LIMIT_ENABLED is off
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rule: RateLimitRule,
+        key: Callable[[Request], Awaitable[Optional[str]]],
+    ):
+        self.name = name
+        self.rule = rule
+        self.key = key
+
+    async def __call__(self, request: Request) -> None:
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+
+        key = await self.key(request)
+        if key is None:
+            return
+
+        retry_after = await rate_limit_backend.hit(
+            f"{self.name}:{key}", self.rule.limit, self.rule.window
+        )
+        if retry_after:
+            raise TooManyRequestsError(headers={"Retry-After": str(int(retry_after))})
+
+
+async def get_email_key(request: Request) -> Optional[str]:
+    """
+    Email of JSON body, body is cached by request, so route reads it again for free
+    """
+    try:
+        email = (await request.json()).get("email")
+    except (ValueError, AttributeError):
+        return None
+    if not isinstance(email, str):
+        return None
+    return email.strip().lower()[:EMAIL_KEY_MAX_LENGTH]
@@ -0,0 +1,7 @@
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from config.settings import settings
+
+
+def get_default_response_class() -> type[JSONResponse]:
+    return ORJSONResponse if settings.ORJSON_RESPONSE else JSONResponse
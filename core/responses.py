@@ -42,4 +42,12 @@ INVALID_ADDRESS: APIResponseType = {
     422: {"model": ExceptionMessageSchema, "description": "Address is invalid"}
 }
 
+TOO_MANY_REQUESTS: APIResponseType = {
+    429: {"model": ExceptionMessageSchema, "description": "Too many requests"}
+}
+
+SERVICE_UNAVAILABLE: APIResponseType = {
+    503: {"model": ExceptionMessageSchema, "description": "Service unavailable"}
+}
+
 CRUD_RESPONSES: APIResponseType = UNAUTHORIZED | PERMISSION_DENIED | NOT_FOUND
@@ -0,0 +1,210 @@
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Optional, Sequence
+
+from sqlalchemy import delete, insert
+from sqlalchemy.sql import Delete, Insert
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import Select, SelectOfScalar
+
+from common.types import ClaimsDict
+from config.settings import settings
+from core.bloom import BloomFilter, BloomIndex
+from models.revoked_token import RevokedToken
+
+
+class RevocationIndex(BloomIndex):
+    """
+    In-process index of revoked token ids
+    Recently revoked ids are kept in exact set, all of them in bloom filter, so
+    most tokens, which are not revoked, are checked without database round trip
+    Index is refreshed from revoked_tokens table incrementally, by growing id
+    """
+
+    def __init__(
+        self,
+        *,
+        capacity: int,
+        error_rate: float,
+        recent_size: int,
+        refresh_interval: float,
+        refresh_overlap: int,
+        prune_interval: float,
+    ):
+        self.recent_size = recent_size
+        self.prune_interval = prune_interval
+        super().__init__(
+            capacity=capacity,
+            error_rate=error_rate,
+            refresh_interval=refresh_interval,
+            refresh_overlap=refresh_overlap,
+        )
+
+    def clear(self) -> None:
+        super().clear()
+        with self._lock:
+            self._recent: OrderedDict[str, None] = OrderedDict()
+            self._pruned_at = time.monotonic()
+
+    def _add(self, jti: str, id: Optional[int]) -> None:
+        super()._add(jti, id)
+        self._add_recent(self._recent, jti)
+
+    def _add_recent(self, recent: OrderedDict[str, None], jti: str) -> None:
+        recent[jti] = None
+        recent.move_to_end(jti)
+        while len(recent) > self.recent_size:
+            recent.popitem(last=False)
+
+    def check(self, jti: str) -> Optional[bool]:
+        """
+        Return True if token is revoked, False if it's not
+        and None if it may be revoked and database has to be asked
+        """
+        with self._lock:
+            if jti in self._recent:
+                return True
+            if jti in self._bloom:
+                return None
+            return False
+
+    @property
+    def needs_prune(self) -> bool:
+        return time.monotonic() - self._pruned_at >= self.prune_interval
+
+    def get_refresh_query(self) -> Select[tuple[int, str]]:
+        query = select(RevokedToken.id, RevokedToken.jti).order_by(RevokedToken.id)
+        last_id = self._start_refresh()
+        if last_id is not None:
+            query = query.where(RevokedToken.id > last_id)
+        return query
+
+    def get_rebuild_query(self) -> Select[tuple[int, str]]:
+        """
+        Mark prune as started, so concurrent callers skip it,
+        return query of all tokens to rebuild index from
+        """
+        self._pruned_at = time.monotonic()
+        return select(RevokedToken.id, RevokedToken.jti).order_by(RevokedToken.id)
+
+    def rebuild(self, rows: Sequence[Sequence[Any]]) -> None:
+        """
+        Replace index with rows of all tokens ordered by id, e.g. after pruning
+        New index is built aside and swapped in, so concurrent checks use the old
+        one meanwhile. Its recent ids are kept, they may be revoked after rows
+        were read
+        """
+        bloom = BloomFilter(max(self.capacity, len(rows) * 2), self.error_rate)
+        recent: OrderedDict[str, None] = OrderedDict()
+        for _, jti in rows:
+            bloom.add(jti)
+            self._add_recent(recent, jti)
+
+        with self._lock:
+            for jti in self._recent:
+                bloom.add(jti)
+                self._add_recent(recent, jti)
+            self._bloom = bloom
+            self._recent = recent
+            self._last = rows[-1][0] if rows else None
+
+
+revocation_index = RevocationIndex(
+    capacity=settings.REVOCATION_BLOOM_CAPACITY,
+    error_rate=settings.REVOCATION_BLOOM_ERROR_RATE,
+    recent_size=settings.REVOCATION_RECENT_SIZE,
+    refresh_interval=settings.REVOCATION_REFRESH_SECONDS,
+    refresh_overlap=settings.REVOCATION_REFRESH_OVERLAP,
+    prune_interval=settings.REVOCATION_PRUNE_SECONDS,
+)
+
+
+def _get_prune_query() -> Delete:
+    return delete(RevokedToken).where(RevokedToken.expires_at <= datetime.utcnow())
+
+
+def _get_exists_query(jti: str) -> SelectOfScalar[int]:
+    return select(1).select_from(RevokedToken).where(RevokedToken.jti == jti)
+
+
+def _refresh_index(session: Session) -> None:
+    if revocation_index.needs_prune:
+        # Bloom filter can't forget, so it's rebuilt without expired tokens
+        query = revocation_index.get_rebuild_query()
+        session.execute(_get_prune_query())
+        session.commit()
+        revocation_index.rebuild(session.execute(query).all())
+    if revocation_index.needs_refresh:
+        revocation_index.load(session.execute(revocation_index.get_refresh_query()))
+
+
+async def _refresh_index_async(session: AsyncSession) -> None:
+    if revocation_index.needs_prune:
+        query = revocation_index.get_rebuild_query()
+        await session.execute(_get_prune_query())
+        await session.commit()
+        revocation_index.rebuild((await session.execute(query)).all())
+    if revocation_index.needs_refresh:
+        rows = await session.execute(revocation_index.get_refresh_query())
+        revocation_index.load(rows)
+
+
+def is_revoked(session: Session, claims: ClaimsDict) -> bool:
+    """
+    Check if token with given claims was revoked
+    Tokens issued before jti was introduced can't be revoked
+    """
+    if "jti" not in claims:
+        return False
+
+    _refresh_index(session)
+    revoked = revocation_index.check(claims["jti"])
+    if revoked is None:
+        revoked = session.exec(_get_exists_query(claims["jti"])).first() is not None
+        if revoked:
+            revocation_index.add(claims["jti"])
+    return revoked
+
+
+async def is_revoked_async(session: AsyncSession, claims: ClaimsDict) -> bool:
+    """
+    Same as is_revoked, but works with AsyncSession
+    """
+    if "jti" not in claims:
+        return False
+
+    await _refresh_index_async(session)
+    revoked = revocation_index.check(claims["jti"])
+    if revoked is None:
+        result = await session.execute(_get_exists_query(claims["jti"]))
+        revoked = result.first() is not None
+        if revoked:
+            revocation_index.add(claims["jti"])
+    return revoked
+
+
+def _get_revoke_query(claims: ClaimsDict) -> Insert:
+    return insert(RevokedToken).values(
+        jti=claims["jti"], expires_at=datetime.utcfromtimestamp(claims["exp"])
+    )
+
+
+def revoke(session: Session, claims: ClaimsDict) -> None:
+    """
+    Revoke token with given claims until it expires
+    Other processes see revocation after their next index refresh
+    """
+    session.execute(_get_revoke_query(claims))
+    session.commit()
+    revocation_index.add(claims["jti"])
+
+
+async def revoke_async(session: AsyncSession, claims: ClaimsDict) -> None:
+    """
+    Same as revoke, but works with AsyncSession
+    """
+    await session.execute(_get_revoke_query(claims))
+    await session.commit()
+    revocation_index.add(claims["jti"])
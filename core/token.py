@@ -1,13 +1,24 @@
+import hashlib
+import threading
+import time
+import uuid
 from calendar import timegm
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Any, Sequence
+from typing import Any, NamedTuple, Optional, Sequence
 
 from jose import JWTError, jwt
 from sqlalchemy.exc import NoResultFound
+from sqlalchemy.orm import make_transient_to_detached
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import SelectOfScalar
 
-from common.types import ClaimsDict
+from common.types import ClaimsDict, DataDict
 from config.settings import settings
+from core import keys, revocation
+from core.keys import KeyRing
+from core.metrics import jwt_duration
 from models import User
 
 
@@ -15,6 +26,99 @@ class TokenError(Exception):
     pass
 
 
+class _TokenCacheEntry(NamedTuple):
+    expires_at: float
+    user_id: int
+    claims: ClaimsDict
+    user_data: DataDict
+
+
+class TokenCache:
+    """
+    Bounded LRU cache of already verified tokens
+    Entries expire together with the token or after ttl seconds, whichever is sooner
+    """
+
+    def __init__(self, maxsize: int, ttl: int):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[bytes, _TokenCacheEntry] = OrderedDict()
+        self._user_keys: dict[int, set[bytes]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _make_key(token_type: str, token_string: str) -> bytes:
+        return hashlib.sha256(f"{token_type}:{token_string}".encode()).digest()
+
+    def get(
+        self, token_type: str, token_string: str
+    ) -> Optional[tuple[ClaimsDict, DataDict]]:
+        if not self.maxsize:
+            return None
+
+        key = self._make_key(token_type, token_string)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.time():
+                self._remove(key)
+                return None
+
+            self._entries.move_to_end(key)
+            return entry.claims, entry.user_data
+
+    def set(
+        self, token_type: str, token_string: str, claims: ClaimsDict, user: User
+    ) -> None:
+        if not self.maxsize:
+            return
+
+        key = self._make_key(token_type, token_string)
+        entry = _TokenCacheEntry(
+            expires_at=min(claims["exp"], time.time() + self.ttl),
+            user_id=user.id,
+            claims=claims,
+            user_data=user.dict(),
+        )
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = entry
+            self._user_keys.setdefault(user.id, set()).add(key)
+
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: int) -> None:
+        """
+        Drop all cached tokens of the user, e.g. after user was updated or deleted
+        """
+        with self._lock:
+            for key in self._user_keys.pop(user_id, ()):
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._user_keys.clear()
+
+    def _remove(self, key: bytes) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+
+        keys = self._user_keys.get(entry.user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._user_keys[entry.user_id]
+
+
+token_cache = TokenCache(
+    maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.TOKEN_CACHE_TTL_SECONDS
+)
+
+
 class Token:
     """
     Base class for managing tokens with limited lifespan
@@ -23,7 +127,9 @@ class Token:
     is_abstract: bool = True
 
     token_type: str = "access"
-    lifetime: timedelta = timedelta(settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    lifetime: timedelta = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    stateless: bool = settings.ACCESS_TOKEN_STATELESS
+    email_fallback: bool = settings.TOKEN_EMAIL_FALLBACK
 
     algorithm: str = settings.ALGORITHM
     algorithm_options: dict[str, bool | int] = {}
@@ -31,6 +137,7 @@ class Token:
     required_claims: Sequence[str] = ("email",)
 
     signing_key: str = settings.SECRET_KEY
+    key_ring: Optional[KeyRing] = keys.key_ring
     error_message = "Token is invalid or expired"
 
     _token_string: str
@@ -70,8 +177,26 @@ class Token:
     def _encode(cls, claims: ClaimsDict) -> str:
         """
         Return token with claims
+        Tokens signed with key ring have kid header of the active key
         """
-        return jwt.encode(claims, cls.signing_key, algorithm=cls.algorithm)
+        with jwt_duration.time("encode"):
+            if cls.key_ring is None:
+                return jwt.encode(claims, cls.signing_key, algorithm=cls.algorithm)
+
+            key = cls.key_ring.active
+            return jwt.encode(
+                claims, key.key, algorithm=key.algorithm, headers={"kid": key.kid}
+            )
+
+    @classmethod
+    def _get_verification_key(cls, token_string: str) -> tuple[Any, str]:
+        if cls.key_ring is None:
+            return cls.signing_key, cls.algorithm
+
+        key = cls.key_ring.get(jwt.get_unverified_header(token_string).get("kid"))
+        if key is None:
+            raise TokenError(cls.error_message)
+        return key.public_key, key.algorithm
 
     @classmethod
     def _decode(cls, token_string: str) -> ClaimsDict:
@@ -79,12 +204,14 @@ class Token:
         Decode claims from token_string
         """
         try:
-            return jwt.decode(
-                token_string,
-                cls.signing_key,
-                algorithms=cls.algorithm,
-                options={"require_exp": True} | cls.algorithm_options,
-            )
+            with jwt_duration.time("decode"):
+                key, algorithm = cls._get_verification_key(token_string)
+                return jwt.decode(
+                    token_string,
+                    key,
+                    algorithms=algorithm,
+                    options={"require_exp": True} | cls.algorithm_options,
+                )
         except JWTError:
             raise TokenError(cls.error_message)
 
@@ -106,42 +233,171 @@ class Token:
             if claim not in claims:
                 raise TokenError(cls.error_message)
 
+    @classmethod
+    def get_claims_from_string(cls, token_string: str) -> ClaimsDict:
+        """
+        Verify given token_string and return its claims
+        """
+        claims = cls._decode(token_string)
+        cls._verify_claims(claims)
+        return claims
+
+    @classmethod
+    def _verify_not_revoked(cls, claims: ClaimsDict, session: Session) -> None:
+        if revocation.is_revoked(session, claims):
+            raise TokenError(cls.error_message)
+
+    @classmethod
+    async def _verify_not_revoked_async(
+        cls, claims: ClaimsDict, session: AsyncSession
+    ) -> None:
+        if await revocation.is_revoked_async(session, claims):
+            raise TokenError(cls.error_message)
+
+    @classmethod
+    def _get_user_from_claims(cls, claims: ClaimsDict) -> User:
+        """
+        Build detached user from claims of stateless token, without querying database
+        Only id, email and is_admin are known, other fields are empty
+        """
+        return User(
+            id=int(claims["sub"]), email=claims["email"], is_admin=claims["is_admin"]
+        )
+
+    @classmethod
+    def _get_user_query(cls, claims: ClaimsDict) -> SelectOfScalar[User]:
+        """
+        Lookup by email for tokens issued before sub claim was introduced
+        """
+        if not cls.email_fallback:
+            raise TokenError(cls.error_message)
+        return select(User).where(User.email == claims["email"])
+
     @classmethod
     def _get_user(cls, claims: ClaimsDict, session: Session) -> User:
-        query = select(User).where(User.email == claims["email"])
+        if "sub" in claims:
+            # Primary key lookup, served from identity map if user is already loaded
+            user = session.get(User, int(claims["sub"]))
+            if user is None:
+                raise TokenError(cls.error_message)
+            return user
+
         try:
-            return session.exec(query).one()
+            return session.exec(cls._get_user_query(claims)).one()
         except NoResultFound:
             raise TokenError(cls.error_message)
 
+    @classmethod
+    async def _get_user_async(cls, claims: ClaimsDict, session: AsyncSession) -> User:
+        if "sub" in claims:
+            user = await session.get(User, int(claims["sub"]))
+            if user is None:
+                raise TokenError(cls.error_message)
+            return user
+
+        result = await session.execute(cls._get_user_query(claims))
+        try:
+            return result.scalars().one()
+        except NoResultFound:
+            raise TokenError(cls.error_message)
+
+    @classmethod
+    def _restore_user(cls, user_data: DataDict) -> User:
+        """
+        Build detached user from cached snapshot
+        Merging it with load=False attaches it to session without querying database
+        """
+        user = User(**user_data)
+        make_transient_to_detached(user)
+        return user
+
     @classmethod
     def _get_claims(cls, *, user: User, from_time: datetime) -> ClaimsDict:
-        return {
+        claims = {
             "token_type": cls.token_type,
             "exp": cls._calculate_exp(from_time),
+            "sub": str(user.id),
             "email": user.email,
+            "jti": uuid.uuid4().hex,
         }
+        if cls.stateless:
+            claims["is_admin"] = user.is_admin
+        return claims
 
     @classmethod
     def get_user_from_string(cls, token_string: str, session: Session) -> User:
         """
         Verify given token_string and return user
+        Already verified tokens are served from token_cache
+        Stateless tokens are trusted without querying database at all
+        Revocation is checked by in-process index, see core.revocation
         """
-        claims = cls._decode(token_string)
-        cls._verify_claims(claims)
+        cached = token_cache.get(cls.token_type, token_string)
+        if cached is not None:
+            claims, user_data = cached
+            cls._verify_not_revoked(claims, session)
+            return session.merge(cls._restore_user(user_data), load=False)
+
+        claims = cls.get_claims_from_string(token_string)
+        cls._verify_not_revoked(claims, session)
+        # Tokens issued before stateless mode was enabled have no is_admin
+        if cls.stateless and "is_admin" in claims:
+            return cls._get_user_from_claims(claims)
+
         user = cls._get_user(claims, session)
+        token_cache.set(cls.token_type, token_string, claims, user)
+
+        return user
+
+    @classmethod
+    async def get_user_from_string_async(
+        cls, token_string: str, session: AsyncSession
+    ) -> User:
+        """
+        Same as get_user_from_string, but works with AsyncSession
+        """
+        cached = token_cache.get(cls.token_type, token_string)
+        if cached is not None:
+            claims, user_data = cached
+            await cls._verify_not_revoked_async(claims, session)
+            return await session.merge(cls._restore_user(user_data), load=False)
+
+        claims = cls.get_claims_from_string(token_string)
+        await cls._verify_not_revoked_async(claims, session)
+        # Tokens issued before stateless mode was enabled have no is_admin
+        if cls.stateless and "is_admin" in claims:
+            return cls._get_user_from_claims(claims)
+
+        user = await cls._get_user_async(claims, session)
+        token_cache.set(cls.token_type, token_string, claims, user)
 
         return user
 
     @classmethod
     def generate_token_for_user(
-        cls, user: User, instantiation_time: datetime | None = None
+        cls,
+        user: User,
+        instantiation_time: datetime | None = None,
+        extra_claims: ClaimsDict | None = None,
     ) -> str:
         """
         Generate token for a given user
         """
         instantiation_time = instantiation_time or datetime.utcnow()
         claims = cls._get_claims(user=user, from_time=instantiation_time)
-        token_string = cls._encode(claims)
+        token_string = cls._encode(claims | (extra_claims or {}))
 
         return token_string
+
+
+class RefreshToken(Token):
+    """
+    Long living token exchanged for new access and refresh tokens
+    Each token can be used once, see auth.services.refresh_tokens
+    """
+
+    token_type: str = "refresh"
+    lifetime: timedelta = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    stateless: bool = False
+
+    required_claims: Sequence[str] = ("sub", "jti", "family")
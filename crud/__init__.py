@@ -1,8 +1,10 @@
-from crud.base import BaseCRUDService
+from crud.user import AsyncUserCRUDService, UserCRUDService
 from models.user import User
 
-user = BaseCRUDService(User)
+user = UserCRUDService(User)
+async_user = AsyncUserCRUDService(User)
 
 __all__ = [
     "user",
+    "async_user",
 ]
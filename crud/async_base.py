@@ -0,0 +1,354 @@
+from typing import Sequence
+
+from fastapi_pagination.bases import AbstractPage, AbstractParams
+from fastapi_pagination.ext.sqlmodel import paginate
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from common.types import DataDict, ModelType
+from crud.base import Ids, _BaseCRUDService
+
+
+class AsyncBaseCRUDService(_BaseCRUDService[ModelType]):
+    """
+    Same as BaseCRUDService, but works with AsyncSession and has async hooks
+    """
+
+    async def get(self, session: AsyncSession, id: str | int) -> ModelType:
+        """
+        Retrieve single instance by id
+        """
+        result = await session.exec(self.get_query().filter(self.model.id == id))
+        return result.one()
+
+    async def exists_by_id(self, session: AsyncSession, id: str | int) -> bool:
+        """
+        Check if instance with given id exists
+        """
+        result = await session.exec(self.exists_query(id))
+        return bool(result.one_or_none())
+
+    async def list(
+        self, session: AsyncSession, fields: Sequence[str] | None = None
+    ) -> list[ModelType] | list[DataDict]:
+        """
+        Retrieve all objects from database
+        If fields are given, only these columns are loaded and returned as dicts
+        """
+        if fields is None:
+            result = await session.exec(self.list_query())
+            return result.all()
+
+        query = self.project_query(self.list_query(), fields)
+        rows = (await session.execute(query)).all()
+        return self._rows_to_dicts(rows)
+
+    async def paginate(
+        self,
+        session: AsyncSession,
+        params: AbstractParams | None = None,
+        fields: Sequence[str] | None = None,
+    ) -> AbstractPage[ModelType] | AbstractPage[DataDict]:
+        """
+        Retrieve single page of objects
+        LIMIT/OFFSET and COUNT are executed by database, so only one page is loaded
+        If fields are given, only these columns are loaded and returned as dicts
+        """
+        query = self.paginate_query()
+        if fields is not None:
+            query = self.project_query(query, fields)
+        return await paginate(
+            session, query, params, transformer=self._paginate_transformer(fields)
+        )
+
+    async def cursor_paginate(
+        self,
+        session: AsyncSession,
+        cursor: str | None = None,
+        size: int = 50,
+        order_by: str = "id",
+        fields: Sequence[str] | None = None,
+    ) -> tuple[Sequence[ModelType] | Sequence[DataDict], str | None]:
+        """
+        Retrieve single page of objects after given cursor and cursor for next page
+        If fields are given, only these columns are loaded and returned as dicts
+        """
+        query, cursor_fields = self.cursor_query(cursor, size, order_by)
+        if fields is None:
+            result = await session.exec(query)
+            return self._cursor_page(result.all(), size, cursor_fields)
+
+        query = self.cursor_project_query(query, fields, cursor_fields)
+        rows = (await session.execute(query)).all()
+        rows, next_cursor = self._cursor_page(rows, size, cursor_fields)
+        return self._rows_to_dicts(rows), next_cursor
+
+    async def create(
+        self, session: AsyncSession, data: DataDict, commit: bool = True
+    ) -> ModelType:
+        self._verify_data_keys(data, "create_fields")
+        data = await self.before_create(session, data)
+        model = await self.perform_create(session, data, commit=commit)
+        await self.after_create(session, model)
+        return model
+
+    async def perform_create(
+        self, session: AsyncSession, data: DataDict, commit: bool = True
+    ) -> ModelType:
+        """
+        Create model from input data
+        Overwrite this if you need custom creation logic
+        """
+        model = self.model(**data)
+        session.add(model)
+
+        if commit:
+            await session.commit()
+
+        return model
+
+    async def before_create(self, session: AsyncSession, data: DataDict) -> DataDict:
+        """
+        Hook called before creating model
+        Overwrite this to define custom validation or data modification logic
+        """
+        return data
+
+    async def after_create(self, session: AsyncSession, model: ModelType) -> None:
+        """
+        Hook called after model was created and session committed
+        """
+        pass
+
+    async def update(
+        self,
+        session: AsyncSession,
+        instance: ModelType,
+        data: DataDict,
+        commit: bool = True,
+    ) -> ModelType:
+        self._verify_data_keys(data, "update_fields")
+        data = await self.before_update(session, instance, data)
+        updated = await self.perform_update(session, instance, data, commit=commit)
+        await self.after_update(session, updated)
+        return updated
+
+    async def perform_update(
+        self,
+        session: AsyncSession,
+        instance: ModelType,
+        data: DataDict,
+        commit: bool = True,
+    ) -> ModelType:
+        """
+        Update model from input data
+        Overwrite this if you need custom update logic
+        """
+        for field, value in data.items():
+            setattr(instance, field, value)
+
+        session.add(instance)
+
+        if commit:
+            await session.commit()
+
+        return instance
+
+    async def before_update(
+        self, session: AsyncSession, instance: ModelType, data: DataDict
+    ) -> DataDict:
+        """
+        Hook called before updating model
+        Overwrite this to define custom validation or data modification logic
+        """
+        return data
+
+    async def after_update(self, session: AsyncSession, instance: ModelType) -> None:
+        """
+        Hook called after model was updated and session committed
+        """
+        pass
+
+    async def delete(
+        self, session: AsyncSession, instance: ModelType, commit: bool = True
+    ) -> None:
+        await self.before_delete(session, instance)
+        await self.perform_delete(session, instance, commit=commit)
+        await self.after_delete(session, instance)
+
+    async def perform_delete(
+        self, session: AsyncSession, instance: ModelType, commit: bool = True
+    ) -> None:
+        """
+        Delete model from database
+        Overwrite this if you need custom deletion logic (you probably don't)
+        """
+        await session.delete(instance)
+        if commit:
+            await session.commit()
+
+    async def before_delete(self, session: AsyncSession, instance: ModelType) -> None:
+        """
+        Hook called before deleting model
+        """
+        pass
+
+    async def after_delete(self, session: AsyncSession, instance: ModelType) -> None:
+        """
+        Hook called after model was deleted and session committed
+        """
+        pass
+
+    async def update_by_id(
+        self,
+        session: AsyncSession,
+        id: str | int,
+        data: DataDict,
+        commit: bool = True,
+    ) -> None:
+        """
+        Update object with single UPDATE statement, without loading it
+        Bulk update hooks are called with single id
+        Raises NoResultFound if there is no object with given id
+        """
+        self._verify_data_keys(data, "update_fields")
+        data = await self.before_bulk_update(session, [id], data)
+
+        if data:
+            result = await session.execute(self.update_by_id_query(id, data))
+            rowcount = result.rowcount
+        else:
+            rowcount = int(await self.exists_by_id(session, id))
+        self._verify_rowcount(rowcount, id)
+        if commit:
+            await session.commit()
+
+        await self.after_bulk_update(session, [id])
+
+    async def delete_by_id(
+        self, session: AsyncSession, id: str | int, commit: bool = True
+    ) -> None:
+        """
+        Delete object with single DELETE statement, without loading it
+        Bulk delete hooks are called with single id
+        Raises NoResultFound if there is no object with given id
+        """
+        await self.before_bulk_delete(session, [id])
+
+        result = await session.execute(self.delete_by_id_query(id))
+        self._verify_rowcount(result.rowcount, id)
+        if commit:
+            await session.commit()
+
+        await self.after_bulk_delete(session, [id])
+
+    async def bulk_create(
+        self,
+        session: AsyncSession,
+        data_list: Sequence[DataDict],
+        commit: bool = True,
+        chunk_size: int | None = None,
+    ) -> int:
+        """
+        Insert objects with executemany, committing once per chunk
+        Only batch hooks are called, per object hooks are skipped
+        """
+        self._verify_bulk_data_keys(data_list, "create_fields")
+        data_list = await self.before_bulk_create(session, data_list)
+
+        for chunk in self._chunks(data_list, chunk_size or self.bulk_chunk_size):
+            await session.execute(
+                self.bulk_insert_query(), self.bulk_insert_params(chunk)
+            )
+            if commit:
+                await session.commit()
+
+        await self.after_bulk_create(session, data_list)
+        return len(data_list)
+
+    async def before_bulk_create(
+        self, session: AsyncSession, data_list: Sequence[DataDict]
+    ) -> Sequence[DataDict]:
+        """
+        Hook called once before bulk creating objects
+        """
+        return data_list
+
+    async def after_bulk_create(
+        self, session: AsyncSession, data_list: Sequence[DataDict]
+    ) -> None:
+        """
+        Hook called once after objects were bulk created and session committed
+        """
+        pass
+
+    async def bulk_update(
+        self,
+        session: AsyncSession,
+        ids: Ids,
+        data: DataDict,
+        commit: bool = True,
+        chunk_size: int | None = None,
+    ) -> int:
+        """
+        Set the same data to objects with given ids, return number of updated rows
+        """
+        self._verify_data_keys(data, "update_fields")
+        data = await self.before_bulk_update(session, ids, data)
+
+        rowcount = 0
+        for chunk in self._chunks(ids, chunk_size or self.bulk_chunk_size):
+            result = await session.execute(self.bulk_update_query(chunk, data))
+            rowcount += result.rowcount
+            if commit:
+                await session.commit()
+
+        await self.after_bulk_update(session, ids)
+        return rowcount
+
+    async def before_bulk_update(
+        self, session: AsyncSession, ids: Ids, data: DataDict
+    ) -> DataDict:
+        """
+        Hook called once before bulk updating objects
+        """
+        return data
+
+    async def after_bulk_update(self, session: AsyncSession, ids: Ids) -> None:
+        """
+        Hook called once after objects were bulk updated and session committed
+        """
+        pass
+
+    async def bulk_delete(
+        self,
+        session: AsyncSession,
+        ids: Ids,
+        commit: bool = True,
+        chunk_size: int | None = None,
+    ) -> int:
+        """
+        Delete objects with given ids, return number of deleted rows
+        """
+        await self.before_bulk_delete(session, ids)
+
+        rowcount = 0
+        for chunk in self._chunks(ids, chunk_size or self.bulk_chunk_size):
+            result = await session.execute(self.bulk_delete_query(chunk))
+            rowcount += result.rowcount
+            if commit:
+                await session.commit()
+
+        await self.after_bulk_delete(session, ids)
+        return rowcount
+
+    async def before_bulk_delete(self, session: AsyncSession, ids: Ids) -> None:
+        """
+        Hook called once before bulk deleting objects
+        """
+        pass
+
+    async def after_bulk_delete(self, session: AsyncSession, ids: Ids) -> None:
+        """
+        Hook called once after objects were bulk deleted and session committed
+        """
+        pass
@@ -1,15 +1,31 @@
-from typing import Generic, Literal, Type
+from typing import Any, Callable, Generic, Iterator, Literal, Sequence, Type, TypeVar
 
+from fastapi_pagination.bases import AbstractPage, AbstractParams
+from fastapi_pagination.ext.sqlmodel import paginate
+from pydantic.fields import ModelField
+from sqlalchemy import delete, insert, tuple_, update
+from sqlalchemy.exc import NoResultFound
+from sqlalchemy.sql import Delete, Insert, Update
 from sqlmodel import Session, select
 from sqlmodel.sql.expression import SelectOfScalar
 
 from common.types import DataDict, ModelType
+from core.pagination import decode_cursor, encode_cursor
 
+T = TypeVar("T")
+Ids = Sequence[str | int]
+
+
+class _BaseCRUDService(Generic[ModelType]):
+    """
+    Query building and validation shared by sync and async CRUD services
+    """
 
-class BaseCRUDService(Generic[ModelType]):
     model: Type[ModelType]
     create_fields: set[str]
     update_fields: set[str]
+    cursor_fields: set[str]
+    bulk_chunk_size: int = 1000
 
     def __init__(
         self,
@@ -17,6 +33,7 @@ class BaseCRUDService(Generic[ModelType]):
     ):
         self.model = model
         self._set_field_sets()
+        self._insert_default_fields = self._get_insert_default_fields()
 
     def _set_field_sets(self) -> None:
         model_fields = set(self.model.__fields__.keys())
@@ -24,6 +41,38 @@ class BaseCRUDService(Generic[ModelType]):
             if not hasattr(self, field_set):
                 setattr(self, field_set, model_fields)
 
+        if not hasattr(self, "cursor_fields"):
+            self.cursor_fields = {
+                column.name
+                for column in self.model.__table__.columns  # type: ignore[attr-defined]
+                if column.primary_key or column.unique or column.index
+            }
+
+    def _get_insert_default_fields(self) -> list[ModelField]:
+        """
+        Fields with model defaults for bulk inserts, which bypass model constructor
+        """
+        primary_keys = {
+            column.name
+            for column in self.model.__table__.primary_key.columns  # type: ignore[attr-defined]
+        }
+        return [
+            field
+            for name, field in self.model.__fields__.items()
+            if not field.required and name not in primary_keys
+        ]
+
+    def _get_insert_defaults(self, data: DataDict) -> DataDict:
+        """
+        Defaults of fields missing in data, evaluated for every row,
+        so rows don't share default_factory values
+        """
+        return {
+            field.name: field.get_default()
+            for field in self._insert_default_fields
+            if field.name not in data
+        }
+
     def base_query(self) -> SelectOfScalar[ModelType]:
         """
         Base query for retrieving model. Used in all methods
@@ -36,33 +85,89 @@ class BaseCRUDService(Generic[ModelType]):
         """
         return self.base_query()
 
-    def get(self, session: Session, id: str | int) -> ModelType:
+    def exists_query(self, id: str | int) -> SelectOfScalar[int]:
+        return select(1).select_from(self.model).filter(self.model.id == id)
+
+    def list_query(self) -> SelectOfScalar[ModelType]:
         """
-        Retrieve single instance by id
+        Return query for retrieving objects list
         """
-        return session.exec(self.get_query().filter(self.model.id == id)).one()
+        return self.base_query()
 
-    def exists_by_id(self, session: Session, id: str | int) -> bool:
+    def paginate_query(self) -> SelectOfScalar[ModelType]:
         """
-        Retrieve single instance by id
+        Return list query with stable ordering, so pages don't overlap
         """
-        return bool(
-            session.exec(
-                select(1).select_from(self.model).filter(self.model.id == id)
-            ).one_or_none()
-        )
+        return self.list_query().order_by(self.model.id)
 
-    def list_query(self) -> SelectOfScalar[ModelType]:
+    def cursor_query(
+        self, cursor: str | None, size: int, order_by: str
+    ) -> tuple[SelectOfScalar[ModelType], list[str]]:
         """
-        Return query for retrieving objects list
+        Return query for page after cursor and fields the cursor is made of
+        Pages are filtered by indexed columns (keyset), so every page costs the same
         """
-        return self.base_query()
+        if order_by not in self.cursor_fields:
+            raise ValueError(f"Ordering by {order_by} is not allowed")
+
+        fields = ["id"] if order_by == "id" else [order_by, "id"]
+        columns = [getattr(self.model, field) for field in fields]
+        query = self.list_query().order_by(*columns)
 
-    def list(self, session: Session) -> list[ModelType]:
+        if cursor is not None:
+            values = decode_cursor(cursor, len(columns))
+            query = query.where(tuple_(*columns) > tuple_(*values))
+
+        return query.limit(size + 1), fields
+
+    def project_query(
+        self, query: SelectOfScalar[ModelType], fields: Sequence[str]
+    ) -> SelectOfScalar[Any]:
         """
-        Retrieve all objects from database
+        Select only given columns instead of whole objects
+        Rows skip identity map and model validation, so they are much cheaper
+        Must be executed with session.execute, session.exec returns first column only
         """
-        return session.exec(self.list_query()).all()
+        columns = self.model.__table__.columns  # type: ignore[attr-defined]
+        for field in fields:
+            if field not in columns:
+                raise ValueError(f"Unknown column {field}")
+        return query.with_only_columns(*[getattr(self.model, f) for f in fields])
+
+    def cursor_project_query(
+        self, query: SelectOfScalar[ModelType], fields: Sequence[str], cursor: list[str]
+    ) -> SelectOfScalar[Any]:
+        """
+        Same as project_query, but keeps fields required to build next cursor
+        """
+        missing = [field for field in cursor if field not in fields]
+        return self.project_query(query, [*fields, *missing])
+
+    @staticmethod
+    def _rows_to_dicts(rows: Sequence[Any]) -> list[DataDict]:
+        return [dict(row._mapping) for row in rows]
+
+    @classmethod
+    def _paginate_transformer(
+        cls, fields: Sequence[str] | None
+    ) -> Callable[[Sequence[Any]], Sequence[Any]] | None:
+        if fields is None:
+            return None
+        if len(fields) == 1:
+            # paginate unwraps single column rows into plain values
+            return lambda items: [{fields[0]: item} for item in items]
+        return cls._rows_to_dicts
+
+    @staticmethod
+    def _cursor_page(
+        items: Sequence[Any], size: int, fields: list[str]
+    ) -> tuple[Sequence[Any], str | None]:
+        if len(items) <= size:
+            return items, None
+
+        items = items[:size]
+        next_cursor = encode_cursor([getattr(items[-1], field) for field in fields])
+        return items, next_cursor
 
     def _verify_data_keys(
         self, data: DataDict, field_set: Literal["create_fields", "update_fields"]
@@ -72,6 +177,130 @@ class BaseCRUDService(Generic[ModelType]):
             if key not in fields:
                 raise ValueError(f"Key {key} is not allowed in {field_set}")
 
+    def _verify_bulk_data_keys(
+        self,
+        data_list: Sequence[DataDict],
+        field_set: Literal["create_fields", "update_fields"],
+    ) -> None:
+        keys: DataDict = {}
+        for data in data_list:
+            keys.update(dict.fromkeys(data))
+        self._verify_data_keys(keys, field_set)
+
+    @staticmethod
+    def _chunks(items: Sequence[T], size: int) -> Iterator[Sequence[T]]:
+        for start in range(0, len(items), size):
+            end = start + size
+            yield items[start:end]
+
+    def bulk_insert_query(self) -> Insert:
+        return insert(self.model)
+
+    def bulk_insert_params(self, data_list: Sequence[DataDict]) -> list[DataDict]:
+        return [self._get_insert_defaults(data) | data for data in data_list]
+
+    def bulk_update_query(self, ids: Ids, data: DataDict) -> Update:
+        return (
+            update(self.model)
+            .where(self.model.id.in_(ids))  # type: ignore[attr-defined]
+            .values(**data)
+            .execution_options(synchronize_session=False)
+        )
+
+    def bulk_delete_query(self, ids: Ids) -> Delete:
+        return (
+            delete(self.model)
+            .where(self.model.id.in_(ids))  # type: ignore[attr-defined]
+            .execution_options(synchronize_session=False)
+        )
+
+    def update_by_id_query(self, id: str | int, data: DataDict) -> Update:
+        return (
+            update(self.model)
+            .where(self.model.id == id)
+            .values(**data)
+            .execution_options(synchronize_session=False)
+        )
+
+    def delete_by_id_query(self, id: str | int) -> Delete:
+        return (
+            delete(self.model)
+            .where(self.model.id == id)
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def _verify_rowcount(rowcount: int, id: str | int) -> None:
+        if not rowcount:
+            raise NoResultFound(f"No row with id {id}")
+
+
+class BaseCRUDService(_BaseCRUDService[ModelType]):
+    def get(self, session: Session, id: str | int) -> ModelType:
+        """
+        Retrieve single instance by id
+        """
+        return session.exec(self.get_query().filter(self.model.id == id)).one()
+
+    def exists_by_id(self, session: Session, id: str | int) -> bool:
+        """
+        Retrieve single instance by id
+        """
+        return bool(session.exec(self.exists_query(id)).one_or_none())
+
+    def list(
+        self, session: Session, fields: Sequence[str] | None = None
+    ) -> list[ModelType] | list[DataDict]:
+        """
+        Retrieve all objects from database
+        If fields are given, only these columns are loaded and returned as dicts
+        """
+        if fields is None:
+            return session.exec(self.list_query()).all()
+
+        query = self.project_query(self.list_query(), fields)
+        return self._rows_to_dicts(session.execute(query).all())
+
+    def paginate(
+        self,
+        session: Session,
+        params: AbstractParams | None = None,
+        fields: Sequence[str] | None = None,
+    ) -> AbstractPage[ModelType] | AbstractPage[DataDict]:
+        """
+        Retrieve single page of objects
+        LIMIT/OFFSET and COUNT are executed by database, so only one page is loaded
+        If fields are given, only these columns are loaded and returned as dicts
+        """
+        query = self.paginate_query()
+        if fields is not None:
+            query = self.project_query(query, fields)
+        return paginate(
+            session, query, params, transformer=self._paginate_transformer(fields)
+        )
+
+    def cursor_paginate(
+        self,
+        session: Session,
+        cursor: str | None = None,
+        size: int = 50,
+        order_by: str = "id",
+        fields: Sequence[str] | None = None,
+    ) -> tuple[Sequence[ModelType] | Sequence[DataDict], str | None]:
+        """
+        Retrieve single page of objects after given cursor and cursor for next page
+        If fields are given, only these columns are loaded and returned as dicts
+        """
+        query, cursor_fields = self.cursor_query(cursor, size, order_by)
+        if fields is None:
+            return self._cursor_page(session.exec(query).all(), size, cursor_fields)
+
+        query = self.cursor_project_query(query, fields, cursor_fields)
+        rows, next_cursor = self._cursor_page(
+            session.execute(query).all(), size, cursor_fields
+        )
+        return self._rows_to_dicts(rows), next_cursor
+
     def create(
         self, session: Session, data: DataDict, commit: bool = True
     ) -> ModelType:
@@ -179,3 +408,149 @@ class BaseCRUDService(Generic[ModelType]):
         Hook called after model was deleted and session committed
         """
         pass
+
+    def update_by_id(
+        self, session: Session, id: str | int, data: DataDict, commit: bool = True
+    ) -> None:
+        """
+        Update object with single UPDATE statement, without loading it
+        Bulk update hooks are called with single id
+        Raises NoResultFound if there is no object with given id
+        """
+        self._verify_data_keys(data, "update_fields")
+        data = self.before_bulk_update(session, [id], data)
+
+        if data:
+            rowcount = session.execute(self.update_by_id_query(id, data)).rowcount
+        else:
+            rowcount = int(self.exists_by_id(session, id))
+        self._verify_rowcount(rowcount, id)
+        if commit:
+            session.commit()
+
+        self.after_bulk_update(session, [id])
+
+    def delete_by_id(
+        self, session: Session, id: str | int, commit: bool = True
+    ) -> None:
+        """
+        Delete object with single DELETE statement, without loading it
+        Bulk delete hooks are called with single id
+        Raises NoResultFound if there is no object with given id
+        """
+        self.before_bulk_delete(session, [id])
+
+        rowcount = session.execute(self.delete_by_id_query(id)).rowcount
+        self._verify_rowcount(rowcount, id)
+        if commit:
+            session.commit()
+
+        self.after_bulk_delete(session, [id])
+
+    def bulk_create(
+        self,
+        session: Session,
+        data_list: Sequence[DataDict],
+        commit: bool = True,
+        chunk_size: int | None = None,
+    ) -> int:
+        """
+        Insert objects with executemany, committing once per chunk
+        Only batch hooks are called, per object hooks are skipped
+        """
+        self._verify_bulk_data_keys(data_list, "create_fields")
+        data_list = self.before_bulk_create(session, data_list)
+
+        for chunk in self._chunks(data_list, chunk_size or self.bulk_chunk_size):
+            session.execute(self.bulk_insert_query(), self.bulk_insert_params(chunk))
+            if commit:
+                session.commit()
+
+        self.after_bulk_create(session, data_list)
+        return len(data_list)
+
+    def before_bulk_create(
+        self, session: Session, data_list: Sequence[DataDict]
+    ) -> Sequence[DataDict]:
+        """
+        Hook called once before bulk creating objects
+        """
+        return data_list
+
+    def after_bulk_create(
+        self, session: Session, data_list: Sequence[DataDict]
+    ) -> None:
+        """
+        Hook called once after objects were bulk created and session committed
+        """
+        pass
+
+    def bulk_update(
+        self,
+        session: Session,
+        ids: Ids,
+        data: DataDict,
+        commit: bool = True,
+        chunk_size: int | None = None,
+    ) -> int:
+        """
+        Set the same data to objects with given ids, return number of updated rows
+        """
+        self._verify_data_keys(data, "update_fields")
+        data = self.before_bulk_update(session, ids, data)
+
+        rowcount = 0
+        for chunk in self._chunks(ids, chunk_size or self.bulk_chunk_size):
+            rowcount += session.execute(self.bulk_update_query(chunk, data)).rowcount
+            if commit:
+                session.commit()
+
+        self.after_bulk_update(session, ids)
+        return rowcount
+
+    def before_bulk_update(
+        self, session: Session, ids: Ids, data: DataDict
+    ) -> DataDict:
+        """
+        Hook called once before bulk updating objects
+        """
+        return data
+
+    def after_bulk_update(self, session: Session, ids: Ids) -> None:
+        """
+        Hook called once after objects were bulk updated and session committed
+        """
+        pass
+
+    def bulk_delete(
+        self,
+        session: Session,
+        ids: Ids,
+        commit: bool = True,
+        chunk_size: int | None = None,
+    ) -> int:
+        """
+        Delete objects with given ids, return number of deleted rows
+        """
+        self.before_bulk_delete(session, ids)
+
+        rowcount = 0
+        for chunk in self._chunks(ids, chunk_size or self.bulk_chunk_size):
+            rowcount += session.execute(self.bulk_delete_query(chunk)).rowcount
+            if commit:
+                session.commit()
+
+        self.after_bulk_delete(session, ids)
+        return rowcount
+
+    def before_bulk_delete(self, session: Session, ids: Ids) -> None:
+        """
+        Hook called once before bulk deleting objects
+        """
+        pass
+
+    def after_bulk_delete(self, session: Session, ids: Ids) -> None:
+        """
+        Hook called once after objects were bulk deleted and session committed
+        """
+        pass
@@ -0,0 +1,78 @@
+from typing import Sequence
+
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from common.types import DataDict
+from core.known_emails import known_emails
+from core.token import token_cache
+from crud.async_base import AsyncBaseCRUDService
+from crud.base import BaseCRUDService, Ids
+from models.user import User
+
+
+class UserCRUDService(BaseCRUDService[User]):
+    def after_create(self, session: Session, model: User) -> None:
+        known_emails.add(model.email)
+
+    def after_bulk_create(
+        self, session: Session, data_list: Sequence[DataDict]
+    ) -> None:
+        for data in data_list:
+            known_emails.add(data["email"])
+
+    def after_update(self, session: Session, instance: User) -> None:
+        known_emails.add(instance.email)
+        token_cache.invalidate_user(instance.id)
+
+    def before_bulk_update(
+        self, session: Session, ids: Ids, data: DataDict
+    ) -> DataDict:
+        # Added before commit, extra email only costs database lookup
+        if "email" in data:
+            known_emails.add(data["email"])
+        return data
+
+    def after_delete(self, session: Session, instance: User) -> None:
+        token_cache.invalidate_user(instance.id)
+
+    def after_bulk_update(self, session: Session, ids: Ids) -> None:
+        for id in ids:
+            token_cache.invalidate_user(int(id))
+
+    def after_bulk_delete(self, session: Session, ids: Ids) -> None:
+        for id in ids:
+            token_cache.invalidate_user(int(id))
+
+
+class AsyncUserCRUDService(AsyncBaseCRUDService[User]):
+    async def after_create(self, session: AsyncSession, model: User) -> None:
+        known_emails.add(model.email)
+
+    async def after_bulk_create(
+        self, session: AsyncSession, data_list: Sequence[DataDict]
+    ) -> None:
+        for data in data_list:
+            known_emails.add(data["email"])
+
+    async def after_update(self, session: AsyncSession, instance: User) -> None:
+        known_emails.add(instance.email)
+        token_cache.invalidate_user(instance.id)
+
+    async def before_bulk_update(
+        self, session: AsyncSession, ids: Ids, data: DataDict
+    ) -> DataDict:
+        if "email" in data:
+            known_emails.add(data["email"])
+        return data
+
+    async def after_delete(self, session: AsyncSession, instance: User) -> None:
+        token_cache.invalidate_user(instance.id)
+
+    async def after_bulk_update(self, session: AsyncSession, ids: Ids) -> None:
+        for id in ids:
+            token_cache.invalidate_user(int(id))
+
+    async def after_bulk_delete(self, session: AsyncSession, ids: Ids) -> None:
+        for id in ids:
+            token_cache.invalidate_user(int(id))
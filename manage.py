@@ -1,10 +1,19 @@
 #!/usr/bin/env python
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+
 import typer
 import uvicorn
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session
 
 from auth.services import create_admin_user
 from config.db import engine
+from user.services import ExportFormat, export_users, import_users, read_user_rows
 
 cli = typer.Typer()
 
@@ -44,5 +53,81 @@ def _create_admin(
             typer.secho("User created successfully", fg="green")
 
 
+@cli.command("import_users")
+def _import_users(
+    path: Path = typer.Argument(..., exists=True, dir_okay=False, help="CSV or JSONL"),
+    chunk_size: int = typer.Option(1000, help="rows per transaction"),
+    workers: int = typer.Option(os.cpu_count() or 1, help="password hashing processes"),
+    resume: bool = typer.Option(True, help="continue from last checkpoint"),
+):
+    """
+    Import users from CSV or JSON lines file with email, password or
+    password_hash, full_name and is_admin columns
+    """
+
+    checkpoint = path.with_name(f"{path.name}.checkpoint")
+    done = int(checkpoint.read_text()) if resume and checkpoint.exists() else 0
+    if done:
+        typer.echo(f"Resuming after {done} rows")
+
+    imported = 0
+    started = time.perf_counter()
+    with Session(engine) as session, ProcessPoolExecutor(workers) as executor:
+        rows = islice(read_user_rows(path), done, None)
+        try:
+            for count in import_users(
+                session, rows, executor=executor, chunk_size=chunk_size
+            ):
+                imported += count
+                checkpoint.write_text(str(done + imported))
+                rate = imported / (time.perf_counter() - started)
+                typer.echo(f"Imported {done + imported} rows ({rate:.0f} rows/s)")
+        except (ValueError, IntegrityError) as e:
+            error = getattr(e, "orig", e)
+            typer.secho(
+                f"Import stopped after {done + imported} rows: {error}", fg="red"
+            )
+            raise typer.Exit(1)
+
+    checkpoint.unlink(missing_ok=True)
+    elapsed = time.perf_counter() - started
+    typer.secho(
+        f"Imported {imported} users in {elapsed:.1f}s ({imported / elapsed:.0f} rows/s)",
+        fg="green",
+    )
+
+
+@cli.command("export_users")
+def _export_users(
+    path: Path = typer.Argument(..., help="output file, - for stdout"),
+    format: ExportFormat = typer.Option(None, help="ndjson or csv, default by suffix"),
+    batch_size: int = typer.Option(1000, help="rows fetched per batch"),
+    with_password_hash: bool = typer.Option(False, help="export password hashes"),
+):
+    """
+    Export users to NDJSON or CSV file with constant memory
+    """
+
+    if format is None:
+        is_csv = path.suffix.lower() == ".csv"
+        format = ExportFormat.csv if is_csv else ExportFormat.ndjson
+    started = time.perf_counter()
+    with Session(engine) as session:
+        chunks = export_users(
+            session,
+            format,
+            batch_size=batch_size,
+            include_password_hash=with_password_hash,
+        )
+        if str(path) == "-":
+            sys.stdout.writelines(chunks)
+        else:
+            with path.open("w", newline="") as file:
+                file.writelines(chunks)
+
+    elapsed = time.perf_counter() - started
+    typer.secho(f"Exported users in {elapsed:.1f}s", fg="green", err=True)
+
+
 if __name__ == "__main__":
     cli()
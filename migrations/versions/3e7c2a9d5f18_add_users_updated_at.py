@@ -0,0 +1,34 @@
+"""Add users updated at
+
+Revision ID: 3e7c2a9d5f18
+Revises: 8a1d4e6f0b93
+Create Date: 2023-10-26 10:14:52.207341
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e7c2a9d5f18'
+down_revision: Union[str, None] = '8a1d4e6f0b93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing rows are filled before the column becomes required
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE users SET updated_at = CURRENT_TIMESTAMP")
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.alter_column('updated_at', existing_type=sa.DateTime(), nullable=False)
+        batch_op.create_index(batch_op.f('ix_users_updated_at'), ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_updated_at'))
+        batch_op.drop_column('updated_at')
@@ -1,5 +1,9 @@
+from models.refresh_token import IssuedRefreshToken
+from models.revoked_token import RevokedToken
 from models.user import User
 
 __all__ = [
+    "IssuedRefreshToken",
+    "RevokedToken",
     "User",
 ]
@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from sqlalchemy import Column, ForeignKey, Integer
+from sqlmodel import Field
+
+from models.base import BaseModel
+
+
+class IssuedRefreshToken(BaseModel, table=True):
+    """
+    Refresh token issued to user, tokens rotated from the same login share family
+    """
+
+    __tablename__ = "refresh_tokens"
+
+    id: int = Field(default=None, primary_key=True)
+    jti: str = Field(sa_column_kwargs={"unique": True})
+    family: str = Field(index=True)
+    user_id: int = Field(
+        sa_column=Column(
+            Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+        )
+    )
+    expires_at: datetime
+    is_used: bool = Field(default=False)
+
+    def __repr__(self) -> str:
+        return f"<IssuedRefreshToken {self.id}>"
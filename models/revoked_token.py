@@ -0,0 +1,20 @@
+from datetime import datetime
+
+from sqlmodel import Field
+
+from models.base import BaseModel
+
+
+class RevokedToken(BaseModel, table=True):
+    """
+    Id of token which must be rejected until it expires
+    """
+
+    __tablename__ = "revoked_tokens"
+
+    id: int = Field(default=None, primary_key=True)
+    jti: str = Field(sa_column_kwargs={"unique": True})
+    expires_at: datetime = Field(index=True)
+
+    def __repr__(self) -> str:
+        return f"<RevokedToken {self.id}>"
@@ -1,10 +1,11 @@
+from datetime import datetime
 from typing import Optional
 
 from passlib.context import CryptContext
-from passlib.exc import UnknownHashError
 from sqlmodel import Field
 
-from config.settings import settings
+from core import hashing
+from core.metrics import password_hashing_duration
 from models.base import BaseModel
 
 
@@ -16,6 +17,12 @@ class User(BaseModel, table=True):
     full_name: Optional[str]
     password: Optional[str]
     is_admin: bool = Field(default=False)
+    # Set by every insert and update, including bulk ones, see core.known_emails
+    updated_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        index=True,
+        sa_column_kwargs={"onupdate": datetime.utcnow},
+    )
 
     def __str__(self) -> str:
         return f"User #{self.id} - {self.email}"
@@ -25,19 +32,55 @@ class User(BaseModel, table=True):
 
     @staticmethod
     def _get_crypto_context() -> CryptContext:
-        return CryptContext(schemes=settings.PASSWORD_HASHING_SCHEME)
+        return hashing.crypto_context
 
     @staticmethod
     def hash_password(password_string: str) -> str:
-        ctx = User._get_crypto_context()
-        return ctx.hash(password_string)
+        with password_hashing_duration.time("hash"):
+            return hashing.hash_password(password_string)
+
+    @staticmethod
+    async def hash_password_async(password_string: str) -> str:
+        # Includes time spent waiting in password hashing pool
+        with password_hashing_duration.time("hash"):
+            return await hashing.password_hasher.run(
+                hashing.hash_password, password_string
+            )
 
     def set_password(self, password_string):
         self.password = self.hash_password(password_string)
 
+    async def set_password_async(self, password_string: str) -> None:
+        self.password = await self.hash_password_async(password_string)
+
     def check_password(self, password_string: str) -> bool:
-        ctx = self._get_crypto_context()
-        try:
-            return ctx.verify(password_string, self.password)
-        except UnknownHashError:
-            return False
+        with password_hashing_duration.time("verify"):
+            is_valid, _ = hashing.verify_and_update_password(
+                password_string, self.password
+            )
+        return is_valid
+
+    def verify_and_update_password(self, password_string: str) -> bool:
+        """
+        Check password and rehash it if stored hash needs update
+        New hash is only assigned, saving user is up to the caller
+        """
+        with password_hashing_duration.time("verify"):
+            is_valid, new_hash = hashing.verify_and_update_password(
+                password_string, self.password
+            )
+        if new_hash:
+            self.password = new_hash
+        return is_valid
+
+    async def verify_and_update_password_async(self, password_string: str) -> bool:
+        """
+        Same as verify_and_update_password, but runs in password hashing pool
+        """
+        with password_hashing_duration.time("verify"):
+            is_valid, new_hash = await hashing.password_hasher.run(
+                hashing.verify_and_update_password, password_string, self.password
+            )
+        if new_hash:
+            self.password = new_hash
+        return is_valid
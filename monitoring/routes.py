@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import Response
+
+from config.db import async_engine, engine
+from config.pool import get_pool_stats
+from core import responses
+from core.deps import get_admin_user
+from core.metrics import PROMETHEUS_CONTENT_TYPE, registry
+from models import User
+from monitoring import schema
+
+router = APIRouter()
+metrics_router = APIRouter()
+
+
+@router.get(
+    "/db-pool",
+    responses=responses.UNAUTHORIZED | responses.PERMISSION_DENIED,
+    response_model=schema.DatabasePoolsSchema,
+)
+async def database_pools(admin: User = Depends(get_admin_user)):
+    """Getting database connection pools statistics"""
+
+    return {
+        "sync": get_pool_stats(engine.pool),
+        "async": get_pool_stats(async_engine.sync_engine.pool),
+    }
+
+
+@metrics_router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Getting metrics in Prometheus text format"""
+
+    return Response(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,24 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class PoolStatsSchema(BaseModel):
+    pool_class: str
+    connects: Optional[int]
+    checkouts: Optional[int]
+    checked_out: Optional[int]
+    invalidations: Optional[int]
+    wait_seconds_total: Optional[float]
+    wait_seconds_max: Optional[float]
+    size: Optional[int]
+    checked_in: Optional[int]
+    overflow: Optional[int]
+
+
+class DatabasePoolsSchema(BaseModel):
+    sync: PoolStatsSchema
+    async_: PoolStatsSchema
+
+    class Config:
+        fields = {"async_": "async"}
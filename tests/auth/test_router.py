@@ -1,7 +1,18 @@
+import asyncio
+
 import pytest
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from auth import services
+from auth.routes import login_account_limit
+from config.asgi import init_app
+from config.settings import settings
+from core.hashing import configure_crypto_context, password_hasher
+from core.known_emails import known_emails
+from core.token import Token
 from models import User
 
 
@@ -26,6 +37,15 @@ class TestRegister:
         ).first()
         assert user
 
+    def test_email_already_registered(
+        self, user: User, client: TestClient, post_data: dict
+    ):
+        post_data["email"] = user.email
+
+        response = client.post(self.url, json=post_data)
+
+        assert response.status_code == 400
+
 
 class TestLoginUser:
     url = "/auth/login/"
@@ -48,3 +68,238 @@ class TestLoginUser:
         response = as_user.post(self.url, json=post_data)
 
         assert response.status_code == 401
+
+    def test_rehash_outdated_password(
+        self,
+        session: Session,
+        as_user: TestClient,
+        user: User,
+        user__password: str,
+        post_data: dict,
+    ):
+        configure_crypto_context(rounds=5)
+        try:
+            response = as_user.post(self.url, json=post_data)
+        finally:
+            configure_crypto_context()
+
+        assert response.status_code == 200
+        session.refresh(user)
+        assert user.password.startswith("$2b$05$")
+        assert user.check_password(user__password)
+
+    def test_password_hasher_busy(
+        self, as_user: TestClient, post_data: dict, monkeypatch: pytest.MonkeyPatch
+    ):
+        monkeypatch.setattr(password_hasher, "max_pending", 0)
+
+        response = as_user.post(self.url, json=post_data)
+
+        assert response.status_code == 503
+
+
+class TestRefresh:
+    url = "/auth/refresh/"
+
+    @pytest.fixture
+    def user__password(self):
+        return "some_random_password"
+
+    @pytest.fixture
+    def tokens(self, client: TestClient, user: User, user__password: str) -> dict:
+        response = client.post(
+            "/auth/login/", json={"email": user.email, "password": user__password}
+        )
+        return response.json()
+
+    def test_ok(self, client: TestClient, user: User, tokens: dict):
+        response = client.post(self.url, json={"refresh": tokens["refresh"]})
+
+        assert response.status_code == 200
+        new_tokens = response.json()
+        assert new_tokens["refresh"] != tokens["refresh"]
+        assert Token.get_claims_from_string(new_tokens["access"])["email"] == user.email
+
+    def test_reuse_revokes_family(self, client: TestClient, tokens: dict):
+        rotated = client.post(self.url, json={"refresh": tokens["refresh"]}).json()
+
+        reused = client.post(self.url, json={"refresh": tokens["refresh"]})
+        after_reuse = client.post(self.url, json={"refresh": rotated["refresh"]})
+
+        assert reused.status_code == 401
+        assert after_reuse.status_code == 401
+
+    def test_access_token_is_rejected(self, client: TestClient, tokens: dict):
+        response = client.post(self.url, json={"refresh": tokens["access"]})
+
+        assert response.status_code == 401
+
+
+class TestLogout:
+    url = "/auth/logout/"
+
+    @pytest.fixture
+    def user__password(self):
+        return "some_random_password"
+
+    @pytest.fixture
+    def login(self, client: TestClient, user: User, user__password: str):
+        data = {"email": user.email, "password": user__password}
+        return lambda: client.post("/auth/login/", json=data).json()
+
+    def test_ok(self, as_user: TestClient, user: User):
+        response = as_user.post(self.url)
+
+        assert response.status_code == 204
+        assert as_user.get(f"/users/{user.id}/").status_code == 401
+
+    def test_revokes_refresh_token(self, client: TestClient, login):
+        tokens = login()
+        other = login()
+        headers = {"Authorization": f"Bearer {tokens['access']}"}
+
+        response = client.post(
+            self.url, json={"refresh": tokens["refresh"]}, headers=headers
+        )
+
+        assert response.status_code == 204
+        refresh = {"refresh": tokens["refresh"]}
+        assert client.post("/auth/refresh/", json=refresh).status_code == 401
+        refresh = {"refresh": other["refresh"]}
+        assert client.post("/auth/refresh/", json=refresh).status_code == 200
+
+    def test_revokes_all_refresh_tokens(self, client: TestClient, login):
+        tokens = login()
+        other = login()
+        headers = {"Authorization": f"Bearer {tokens['access']}"}
+
+        response = client.post(self.url, headers=headers)
+
+        assert response.status_code == 204
+        for refresh in [tokens["refresh"], other["refresh"]]:
+            response = client.post("/auth/refresh/", json={"refresh": refresh})
+            assert response.status_code == 401
+
+    def test_invalid_refresh_token(self, as_user: TestClient):
+        response = as_user.post(self.url, json={"refresh": "invalid"})
+
+        assert response.status_code == 401
+
+
+class TestLoginRateLimit:
+    url = "/auth/login"
+
+    def test_per_ip(self, app: FastAPI, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(settings, "LOGIN_RATE_LIMIT_PER_IP", 2)
+        limited_app = init_app()
+        limited_app.dependency_overrides = app.dependency_overrides
+        client = TestClient(limited_app)
+        responses = [
+            client.post(self.url, json={"email": f"{i}@test.com", "password": "x"})
+            for i in range(3)
+        ]
+
+        assert [r.status_code for r in responses] == [401, 401, 429]
+        assert int(responses[2].headers["retry-after"]) > 0
+
+    def test_per_forwarded_ip(self, app: FastAPI, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(settings, "LOGIN_RATE_LIMIT_PER_IP", 1)
+        monkeypatch.setattr(settings, "FORWARDED_ALLOW_IPS", "testclient")
+        limited_app = init_app()
+        limited_app.dependency_overrides = app.dependency_overrides
+        client = TestClient(limited_app)
+        responses = [
+            client.post(
+                self.url,
+                json={"email": "user@test.com", "password": "x"},
+                headers={"X-Forwarded-For": forwarded_for},
+            )
+            for forwarded_for in ["10.0.0.1", "10.0.0.2", "10.0.0.1"]
+        ]
+
+        assert [r.status_code for r in responses] == [401, 401, 429]
+
+    def test_per_account(
+        self, client: TestClient, user: User, monkeypatch: pytest.MonkeyPatch
+    ):
+        post_data = {"email": user.email, "password": "wrong"}
+        for _ in range(login_account_limit.rule.limit):
+            client.post(self.url, json=post_data)
+
+        async def _get_tokens_for_user(*args):
+            raise AssertionError("Rejected login must not verify password")
+
+        monkeypatch.setattr(services, "get_tokens_for_user", _get_tokens_for_user)
+        response = client.post(self.url, json=post_data | {"email": user.email.upper()})
+
+        assert response.status_code == 429
+
+    def test_disabled(
+        self, client: TestClient, user: User, monkeypatch: pytest.MonkeyPatch
+    ):
+        monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+        post_data = {"email": user.email, "password": "wrong"}
+        responses = [
+            client.post(self.url, json=post_data)
+            for _ in range(login_account_limit.rule.limit + 1)
+        ]
+
+        assert {r.status_code for r in responses} == {401}
+
+
+class TestUnknownEmailLogin:
+    url = "/auth/login/"
+
+    @pytest.fixture
+    def built_known_emails(self, user: User, async_db_engine):
+        async def _build():
+            async with AsyncSession(async_db_engine) as session:
+                await known_emails.build_async(session)
+
+        asyncio.run(_build())
+
+    def test_skips_database(
+        self, client: TestClient, built_known_emails, monkeypatch: pytest.MonkeyPatch
+    ):
+        async def _get_user_by_email(*args):
+            raise AssertionError("Unknown email must not be looked up")
+
+        monkeypatch.setattr(services, "_get_user_by_email", _get_user_by_email)
+        response = client.post(
+            self.url, json={"email": "unknown@test.com", "password": "password"}
+        )
+
+        assert response.status_code == 401
+
+    def test_registered_email_is_known(self, client: TestClient, built_known_emails):
+        post_data = {"email": "new@test.com", "password": "qwerty123"}
+        client.post("/auth/register/", json=post_data)
+
+        response = client.post(self.url, json=post_data)
+
+        assert response.status_code == 200
+
+    def test_delay_policy(self, client: TestClient, monkeypatch: pytest.MonkeyPatch):
+        async def _verify_dummy_password(*args):
+            raise AssertionError("Delay policy must not hash")
+
+        monkeypatch.setattr(settings, "LOGIN_TIMING_POLICY", "delay")
+        monkeypatch.setattr(password_hasher, "average_seconds", 0.01)
+        monkeypatch.setattr(services, "_verify_dummy_password", _verify_dummy_password)
+        response = client.post(
+            self.url, json={"email": "unknown@test.com", "password": "password"}
+        )
+
+        assert response.status_code == 401
+
+    def test_delay_policy_busy(
+        self, client: TestClient, monkeypatch: pytest.MonkeyPatch
+    ):
+        monkeypatch.setattr(settings, "LOGIN_TIMING_POLICY", "delay")
+        monkeypatch.setattr(password_hasher, "average_seconds", 0.01)
+        monkeypatch.setattr(password_hasher, "max_pending", 0)
+        response = client.post(
+            self.url, json={"email": "unknown@test.com", "password": "password"}
+        )
+
+        assert response.status_code == 503
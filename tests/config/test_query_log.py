@@ -0,0 +1,68 @@
+import json
+import logging
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+
+from config.query_log import install_query_logging, logger
+
+
+@pytest.fixture
+def engine() -> Engine:
+    return create_engine("sqlite://")
+
+
+@pytest.fixture
+def caplog(caplog: pytest.LogCaptureFixture):
+    caplog.set_level(logging.INFO, logger=logger.name)
+    return caplog
+
+
+def _execute(engine: Engine) -> None:
+    with engine.connect() as connection:
+        connection.execute(text("SELECT :a, :b"), {"a": 1, "b": 2})
+
+
+class TestQueryLogging:
+    def test_sampled(self, engine: Engine, caplog: pytest.LogCaptureFixture):
+        install_query_logging(engine, sample_rate=1, slow_threshold_ms=None)
+
+        _execute(engine)
+
+        record = json.loads(caplog.records[-1].getMessage())
+        assert record["statement"] == "SELECT ?, ?"
+        assert record["param_count"] == 2
+        assert record["slow"] is False
+
+    def test_slow(self, engine: Engine, caplog: pytest.LogCaptureFixture):
+        install_query_logging(engine, sample_rate=0, slow_threshold_ms=0)
+
+        _execute(engine)
+
+        assert caplog.records[-1].levelno == logging.WARNING
+        assert json.loads(caplog.records[-1].getMessage())["slow"] is True
+
+    def test_disabled(self, engine: Engine, caplog: pytest.LogCaptureFixture):
+        install_query_logging(engine, sample_rate=0, slow_threshold_ms=None)
+
+        _execute(engine)
+
+        assert not caplog.records
+
+    def test_level_disabled(
+        self,
+        engine: Engine,
+        caplog: pytest.LogCaptureFixture,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        caplog.set_level(logging.WARNING, logger=logger.name)
+        json_module = Mock()
+        monkeypatch.setattr("config.query_log.json", json_module)
+        install_query_logging(engine, sample_rate=1, slow_threshold_ms=None)
+
+        _execute(engine)
+
+        assert not caplog.records
+        json_module.dumps.assert_not_called()
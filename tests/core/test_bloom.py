@@ -0,0 +1,29 @@
+from core.bloom import BloomFilter, BloomIndex
+
+
+class TestBloomFilter:
+    def test_ok(self):
+        bloom = BloomFilter(1000, 0.01)
+        keys = [f"key-{i}" for i in range(1000)]
+        for key in keys:
+            bloom.add(key)
+
+        false_positives = sum(f"other-{i}" in bloom for i in range(10_000))
+
+        assert all(key in bloom for key in keys)
+        assert false_positives < 300
+
+
+class TestBloomIndex:
+    def test_refresh_reads_again_overlap(self):
+        index = BloomIndex(
+            capacity=100, error_rate=0.01, refresh_interval=5, refresh_overlap=10
+        )
+        assert index._start_refresh() is None
+
+        index.load([(50, "later"), (30, "earlier")])
+        index.add("added")
+
+        assert index._start_refresh() == 40
+        assert not index.needs_refresh
+        assert all(key in index._bloom for key in ["later", "earlier", "added"])
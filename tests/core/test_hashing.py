@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+from core import hashing
+from core.hashing import (
+    PasswordHasher,
+    PasswordHasherBusyError,
+    configure_crypto_context,
+)
+
+
+@pytest.fixture
+def process_hasher():
+    hasher = PasswordHasher(workers=1, queue_size=1, use_processes=True)
+    yield hasher
+    hasher.shutdown()
+    configure_crypto_context()
+
+
+class TestPasswordHasher:
+    def test_process_pool_reconfigured(self, process_hasher: PasswordHasher):
+        configure_crypto_context(rounds=5)
+        first = asyncio.run(process_hasher.run(hashing.hash_password, "password"))
+
+        configure_crypto_context(rounds=6)
+        second = asyncio.run(process_hasher.run(hashing.hash_password, "password"))
+        _, new_hash = asyncio.run(
+            process_hasher.run(hashing.verify_and_update_password, "password", first)
+        )
+
+        assert first.startswith("$2b$05$")
+        assert second.startswith("$2b$06$")
+        assert new_hash is not None and new_hash.startswith("$2b$06$")
+
+    def test_estimate_includes_queue(self):
+        hasher = PasswordHasher(workers=2, queue_size=4, use_processes=False)
+        hasher.average_seconds = 0.1
+        hasher._pending = 3
+
+        assert hasher.estimate_seconds() == pytest.approx(0.2)
+
+    def test_sleep_busy(self):
+        hasher = PasswordHasher(workers=1, queue_size=0, use_processes=False)
+        hasher._pending = 1
+
+        with pytest.raises(PasswordHasherBusyError):
+            asyncio.run(hasher.sleep())
@@ -0,0 +1,72 @@
+from pathlib import Path
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from fastapi.testclient import TestClient
+from jose import jwt
+
+from core import keys
+from core.keys import KeyRing, load_key_ring
+from core.token import Token, TokenError
+from models import User
+
+
+@pytest.fixture
+def keys_dir(tmp_path: Path) -> Path:
+    for kid in ["old", "new"]:
+        pem = ec.generate_private_key(ec.SECP256R1()).private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+        (tmp_path / f"{kid}.pem").write_bytes(pem)
+    return tmp_path
+
+
+def _use_key_ring(monkeypatch, key_ring: KeyRing) -> None:
+    monkeypatch.setattr(Token, "key_ring", key_ring)
+    monkeypatch.setattr(keys, "key_ring", key_ring)
+
+
+class TestKeyRing:
+    def test_sign_with_active_key(self, keys_dir: Path, user: User, monkeypatch):
+        _use_key_ring(monkeypatch, load_key_ring(keys_dir, "new", "ES256"))
+
+        token = Token.generate_token_for_user(user)
+
+        assert jwt.get_unverified_header(token)["kid"] == "new"
+        assert Token._decode(token)["email"] == user.email
+
+    def test_retiring_key_verifies(self, keys_dir: Path, user: User, monkeypatch):
+        _use_key_ring(monkeypatch, load_key_ring(keys_dir, "old", "ES256"))
+        token = Token.generate_token_for_user(user)
+
+        _use_key_ring(monkeypatch, load_key_ring(keys_dir, "new", "ES256"))
+
+        assert Token._decode(token)["email"] == user.email
+
+    def test_unknown_kid(self, keys_dir: Path, user: User, monkeypatch):
+        _use_key_ring(monkeypatch, load_key_ring(keys_dir, "old", "ES256"))
+        token = Token.generate_token_for_user(user)
+        (keys_dir / "old.pem").unlink()
+
+        _use_key_ring(monkeypatch, load_key_ring(keys_dir, "new", "ES256"))
+
+        with pytest.raises(TokenError):
+            Token._decode(token)
+
+
+class TestJWKS:
+    url = "/.well-known/jwks.json"
+
+    def test_ok(self, keys_dir: Path, client: TestClient, monkeypatch):
+        _use_key_ring(monkeypatch, load_key_ring(keys_dir, "new", "ES256"))
+
+        response = client.get(self.url)
+
+        assert response.status_code == 200
+        assert response.headers["cache-control"].startswith("public, max-age=")
+        jwks = response.json()["keys"]
+        assert [key["kid"] for key in jwks] == ["new", "old"]
+        assert all("d" not in key for key in jwks)
@@ -0,0 +1,107 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import crud
+from core.known_emails import KnownEmails, known_emails
+from models import User
+
+
+async def _build(engine: AsyncEngine, emails: KnownEmails) -> None:
+    async with AsyncSession(engine) as session:
+        await emails.build_async(session)
+
+
+@pytest.fixture
+def built_known_emails(user: User, async_db_engine: AsyncEngine) -> KnownEmails:
+    asyncio.run(_build(async_db_engine, known_emails))
+    return known_emails
+
+
+class TestKnownEmails:
+    def test_not_built(self):
+        emails = KnownEmails(
+            capacity=100,
+            error_rate=0.01,
+            refresh_interval=5,
+            refresh_overlap=timedelta(minutes=1),
+            rebuild_interval=3600,
+        )
+
+        assert emails.might_exist("unknown@test.com")
+
+    def test_build(self, built_known_emails: KnownEmails, user: User):
+        assert built_known_emails.might_exist(user.email)
+        assert not built_known_emails.might_exist("unknown@test.com")
+
+    def test_refresh(
+        self,
+        built_known_emails: KnownEmails,
+        user_factory,
+        async_db_engine,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        new_user = user_factory.create()
+
+        async def _might_exist() -> bool:
+            async with AsyncSession(async_db_engine) as session:
+                return await built_known_emails.might_exist_async(
+                    session, new_user.email
+                )
+
+        monkeypatch.setattr(built_known_emails, "refresh_interval", 0)
+
+        assert asyncio.run(_might_exist())
+
+    def test_update_by_id(
+        self, built_known_emails: KnownEmails, session: Session, user: User
+    ):
+        crud.user.update_by_id(session, user.id, {"email": "changed@test.com"})
+
+        assert built_known_emails.might_exist("changed@test.com")
+
+    def test_refresh_updated_email(
+        self,
+        built_known_emails: KnownEmails,
+        session: Session,
+        user: User,
+        async_db_engine,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        # Changed by other process, which doesn't touch filter of this one
+        session.execute(
+            update(User).where(User.id == user.id).values(email="changed@test.com")
+        )
+        session.commit()
+        monkeypatch.setattr(built_known_emails, "refresh_interval", 0)
+
+        async def _might_exist() -> bool:
+            async with AsyncSession(async_db_engine) as session:
+                return await built_known_emails.might_exist_async(
+                    session, "changed@test.com"
+                )
+
+        assert asyncio.run(_might_exist())
+
+    def test_rebuild(
+        self,
+        built_known_emails: KnownEmails,
+        session: Session,
+        user: User,
+        async_db_engine,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        session.execute(delete(User).where(User.id == user.id))
+        session.commit()
+        monkeypatch.setattr(built_known_emails, "rebuild_interval", 0)
+
+        async def _might_exist() -> bool:
+            async with AsyncSession(async_db_engine) as session:
+                return await built_known_emails.might_exist_async(session, user.email)
+
+        assert not asyncio.run(_might_exist())
@@ -0,0 +1,103 @@
+import contextvars
+import threading
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+
+from core.metrics import (
+    Histogram,
+    MetricsRegistry,
+    _request_stats,
+    _RequestStats,
+    install_query_metrics,
+)
+
+
+@pytest.fixture
+def registry() -> MetricsRegistry:
+    return MetricsRegistry()
+
+
+@pytest.fixture
+def engine() -> Engine:
+    engine = create_engine("sqlite://")
+    install_query_metrics(engine)
+    return engine
+
+
+def _execute(engine: Engine) -> None:
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+class TestHistogram:
+    def test_render(self, registry: MetricsRegistry):
+        histogram = registry.histogram("test_seconds", "Test", ("op",), (0.1, 1))
+
+        histogram.observe(0.05, "a")
+        histogram.observe(0.5, "a")
+        histogram.observe(5, "a")
+
+        lines = registry.render().splitlines()
+        assert lines[:2] == [
+            "# HELP test_seconds Test",
+            "# TYPE test_seconds histogram",
+        ]
+        assert lines[2:] == [
+            'test_seconds_bucket{op="a",le="0.1"} 1',
+            'test_seconds_bucket{op="a",le="1"} 2',
+            'test_seconds_bucket{op="a",le="+Inf"} 3',
+            'test_seconds_sum{op="a"} 5.55',
+            'test_seconds_count{op="a"} 3',
+        ]
+
+    def test_threads(self, registry: MetricsRegistry):
+        histogram = registry.histogram("test_seconds", "Test")
+
+        def _observe() -> None:
+            for _ in range(100):
+                histogram.observe(1)
+
+        threads = [threading.Thread(target=_observe) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sum(histogram.collect()[()][:-1]) == 400
+
+    def test_disabled(self):
+        histogram = Histogram("test_seconds", "Test")
+        histogram.enabled = False
+
+        with histogram.time():
+            pass
+
+        assert histogram.collect() == {}
+
+
+class TestQueryMetrics:
+    def test_request(self, engine: Engine):
+        stats = _RequestStats()
+        token = _request_stats.set(stats)
+        try:
+            _execute(engine)
+            _execute(engine)
+        finally:
+            _request_stats.reset(token)
+
+        assert stats.queries == 2
+        assert stats.db_seconds > 0
+
+    def test_outside_request(self, engine: Engine):
+        outside = contextvars.copy_context()
+        stats = _RequestStats()
+        token = _request_stats.set(stats)
+        try:
+            outside.run(_execute, engine)
+        finally:
+            _request_stats.reset(token)
+
+        assert stats.queries == 0
+        assert stats.db_seconds == 0
@@ -0,0 +1,140 @@
+import asyncio
+from pathlib import Path
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from config.asgi import init_app
+from config.settings import settings
+from core.profiling import ProfilingMiddleware
+from models import User
+from tests.fixtures.api import _make_api_client
+
+
+@pytest.fixture
+def profiled_client(
+    app: FastAPI, user: User, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> TestClient:
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(settings, "PROFILING_HEADER_ENABLED", True)
+    monkeypatch.setattr(settings, "PROFILING_DIR", str(tmp_path))
+    profiled_app = init_app()
+    profiled_app.dependency_overrides = app.dependency_overrides
+    return _make_api_client(TestClient(profiled_app), user)
+
+
+class TestProfilingMiddleware:
+    url = "/users/{id}/"
+
+    def test_header(self, profiled_client: TestClient, user: User, tmp_path: Path):
+        response = profiled_client.get(
+            self.url.format(id=user.id), headers={"X-Profile": "1"}
+        )
+
+        assert response.status_code == 200
+        name = response.headers["x-profile"]
+        assert (tmp_path / f"{name}.prof").exists()
+        report = (tmp_path / f"{name}.txt").read_text()
+        assert report.startswith(f"GET /users/{user.id}")
+        assert "FROM users" in report
+        assert "Concurrent requests: 0\n" in report
+
+    def test_not_profiled(
+        self, profiled_client: TestClient, user: User, tmp_path: Path
+    ):
+        response = profiled_client.get(self.url.format(id=user.id))
+
+        assert "x-profile" not in response.headers
+        assert list(tmp_path.iterdir()) == []
+
+    def test_header_disabled(
+        self,
+        app: FastAPI,
+        user: User,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        monkeypatch.setattr(settings, "PROFILING_ENABLED", True)
+        monkeypatch.setattr(settings, "PROFILING_DIR", str(tmp_path))
+        profiled_app = init_app()
+        profiled_app.dependency_overrides = app.dependency_overrides
+        client = _make_api_client(TestClient(profiled_app), user)
+
+        response = client.get(self.url.format(id=user.id), headers={"X-Profile": "1"})
+
+        assert "x-profile" not in response.headers
+        assert list(tmp_path.iterdir()) == []
+
+    def test_header_without_debug(
+        self,
+        app: FastAPI,
+        user: User,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        monkeypatch.setattr(settings, "DEBUG", False)
+        monkeypatch.setattr(settings, "PROFILING_ENABLED", True)
+        monkeypatch.setattr(settings, "PROFILING_HEADER_ENABLED", True)
+        monkeypatch.setattr(settings, "PROFILING_DIR", str(tmp_path))
+        profiled_app = init_app()
+        profiled_app.dependency_overrides = app.dependency_overrides
+        client = _make_api_client(TestClient(profiled_app), user)
+
+        response = client.get(self.url.format(id=user.id), headers={"X-Profile": "1"})
+
+        assert "x-profile" not in response.headers
+        assert list(tmp_path.iterdir()) == []
+
+    def test_concurrent(self, tmp_path: Path):
+        app = FastAPI()
+        started = asyncio.Event()
+
+        @app.get("/slow")
+        async def slow():
+            started.set()
+            await asyncio.sleep(0.05)
+            return {}
+
+        @app.get("/")
+        async def fast():
+            return {}
+
+        app.add_middleware(ProfilingMiddleware, directory=str(tmp_path), header="X")
+
+        async def run() -> httpx.Response:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+                profiled = asyncio.create_task(c.get("/slow", headers={"X": "1"}))
+                await started.wait()
+                await c.get("/")
+                return await profiled
+
+        response = asyncio.run(run())
+
+        report = (tmp_path / f"{response.headers['x']}.txt").read_text()
+        assert "Concurrent requests: 1\n" in report
+        assert "include ones of concurrent requests" in report
+
+    def test_sampled(self, tmp_path: Path):
+        app = FastAPI()
+        app.get("/")(lambda: {})
+        app.add_middleware(ProfilingMiddleware, directory=str(tmp_path), sample_rate=1)
+
+        response = TestClient(app).get("/")
+
+        assert (tmp_path / f"{response.headers['x-profile']}.txt").exists()
+
+    def test_max_profiles(self, tmp_path: Path):
+        app = FastAPI()
+        app.get("/")(lambda: {})
+        app.add_middleware(
+            ProfilingMiddleware, directory=str(tmp_path), sample_rate=1, max_profiles=2
+        )
+        client = TestClient(app)
+
+        names = [client.get("/").headers["x-profile"] for _ in range(3)]
+
+        assert {path.stem for path in tmp_path.glob("*.prof")} == set(names[1:])
+        assert {path.stem for path in tmp_path.glob("*.txt")} == set(names[1:])
@@ -0,0 +1,52 @@
+import asyncio
+
+from fastapi import Request
+
+from core.rate_limit import EMAIL_KEY_MAX_LENGTH, MemoryRateLimitBackend, get_email_key
+
+
+class TestMemoryRateLimitBackend:
+    def test_ok(self):
+        backend = MemoryRateLimitBackend(shards=2)
+
+        results = [asyncio.run(backend.hit("key", 3, 60)) for _ in range(4)]
+
+        assert results[:3] == [0, 0, 0]
+        assert 0 < results[3] <= 60
+
+    def test_keys_are_independent(self):
+        backend = MemoryRateLimitBackend(shards=2)
+
+        asyncio.run(backend.hit("first", 1, 60))
+
+        assert asyncio.run(backend.hit("second", 1, 60)) == 0
+        assert asyncio.run(backend.hit("first", 1, 60)) > 0
+
+    def test_evicts_least_recently_hit(self):
+        backend = MemoryRateLimitBackend(shards=1, max_keys_per_shard=2)
+        asyncio.run(backend.hit("old", 1, 60))
+        asyncio.run(backend.hit("recent", 1, 60))
+        asyncio.run(backend.hit("old", 1, 60))
+
+        asyncio.run(backend.hit("new", 1, 60))
+
+        assert asyncio.run(backend.hit("old", 1, 60)) > 0
+        assert asyncio.run(backend.hit("recent", 1, 60)) == 0
+
+
+class TestGetEmailKey:
+    def _request(self, body: bytes) -> Request:
+        async def receive():
+            return {"type": "http.request", "body": body}
+
+        return Request({"type": "http", "method": "POST", "headers": []}, receive)
+
+    def test_ok(self):
+        request = self._request(b'{"email": " User@Test.com "}')
+
+        assert asyncio.run(get_email_key(request)) == "user@test.com"
+
+    def test_long_email(self):
+        request = self._request(b'{"email": "' + b"a" * 10_000 + b'"}')
+
+        assert asyncio.run(get_email_key(request)) == "a" * EMAIL_KEY_MAX_LENGTH
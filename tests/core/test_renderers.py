@@ -0,0 +1,14 @@
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from config.settings import settings
+from core.renderers import get_default_response_class
+
+
+class TestDefaultResponseClass:
+    def test_default(self):
+        assert get_default_response_class() is JSONResponse
+
+    def test_orjson(self, monkeypatch):
+        monkeypatch.setattr(settings, "ORJSON_RESPONSE", True)
+
+        assert get_default_response_class() is ORJSONResponse
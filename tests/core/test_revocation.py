@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import Session, select
+
+from core import revocation
+from core.revocation import RevocationIndex, revocation_index
+from models import RevokedToken
+
+
+def _claims(jti: str, expires_in: timedelta = timedelta(hours=1)) -> dict:
+    return {"jti": jti, "exp": int((datetime.utcnow() + expires_in).timestamp())}
+
+
+class TestRevocationIndex:
+    def test_check(self):
+        index = RevocationIndex(
+            capacity=1000,
+            error_rate=0.01,
+            recent_size=1,
+            refresh_interval=5,
+            refresh_overlap=10,
+            prune_interval=3600,
+        )
+        index.add("old")
+        index.add("new")
+
+        assert index.check("new") is True
+        assert index.check("old") is None
+        assert index.check("unknown") is False
+
+    def test_rebuild_keeps_recent(self):
+        index = RevocationIndex(
+            capacity=1000,
+            error_rate=0.01,
+            recent_size=10,
+            refresh_interval=5,
+            refresh_overlap=10,
+            prune_interval=3600,
+        )
+        index.add("revoked_meanwhile")
+
+        index.rebuild([(1, "active")])
+
+        assert index.check("active") is True
+        assert index.check("revoked_meanwhile") is True
+        assert index.check("unknown") is False
+
+
+class TestIsRevoked:
+    def test_revoked_in_database(self, session: Session):
+        session.add(RevokedToken(jti="revoked", expires_at=datetime.utcnow()))
+        session.commit()
+
+        assert revocation.is_revoked(session, _claims("revoked"))
+        assert not revocation.is_revoked(session, _claims("active"))
+
+    def test_bloom_hit_checks_database(
+        self, session: Session, monkeypatch: pytest.MonkeyPatch
+    ):
+        monkeypatch.setattr(revocation_index, "recent_size", 1)
+        revocation.revoke(session, _claims("first"))
+        revocation.revoke(session, _claims("second"))
+
+        assert revocation_index.check("first") is None
+        assert revocation.is_revoked(session, _claims("first"))
+        assert revocation_index.check("first") is True
+
+    def test_prune_expired(self, session: Session, monkeypatch: pytest.MonkeyPatch):
+        revocation.revoke(session, _claims("expired", timedelta(hours=-1)))
+        revocation.revoke(session, _claims("active"))
+        monkeypatch.setattr(revocation_index, "prune_interval", 0)
+
+        assert revocation.is_revoked(session, _claims("active"))
+        assert session.exec(select(RevokedToken.jti)).all() == ["active"]
+
+    def test_prune_keeps_index_until_rebuilt(
+        self, session: Session, monkeypatch: pytest.MonkeyPatch
+    ):
+        revocation.revoke(session, _claims("revoked"))
+        monkeypatch.setattr(revocation_index, "prune_interval", 0)
+        rebuild = revocation_index.rebuild
+
+        def _rebuild(rows):
+            # Concurrent checks during prune still see revoked token
+            assert revocation_index.check("revoked") is True
+            rebuild(rows)
+
+        monkeypatch.setattr(revocation_index, "rebuild", _rebuild)
+
+        assert revocation.is_revoked(session, _claims("revoked"))
@@ -0,0 +1,63 @@
+import pytest
+from sqlmodel import Session
+
+from core.token import Token, TokenError
+from models import User
+
+
+class TestStatelessToken:
+    @pytest.fixture(autouse=True)
+    def _stateless(self, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(Token, "stateless", True)
+
+    def test_user_from_claims(
+        self, user: User, session: Session, monkeypatch: pytest.MonkeyPatch
+    ):
+        token = Token.generate_token_for_user(user)
+
+        def _get_user(*args):
+            raise AssertionError("Database must not be queried")
+
+        monkeypatch.setattr(Token, "_get_user", _get_user)
+        token_user = Token.get_user_from_string(token, session)
+
+        assert (token_user.id, token_user.email, token_user.is_admin) == (
+            user.id,
+            user.email,
+            user.is_admin,
+        )
+
+    def test_token_without_is_admin(self, user: User, session: Session):
+        token = Token.generate_token_for_user(user)
+        claims = Token.get_claims_from_string(token)
+        del claims["is_admin"]
+
+        assert Token.get_user_from_string(Token._encode(claims), session) == user
+
+
+def _make_token_without_sub(user: User) -> str:
+    claims = Token.get_claims_from_string(Token.generate_token_for_user(user))
+    del claims["sub"]
+    return Token._encode(claims)
+
+
+class TestGetUser:
+    def test_by_id(self, user: User, session: Session, monkeypatch: pytest.MonkeyPatch):
+        token = Token.generate_token_for_user(user)
+        monkeypatch.setattr(Token, "email_fallback", False)
+
+        assert Token.get_user_from_string(token, session) == user
+
+    def test_email_fallback(self, user: User, session: Session):
+        token = _make_token_without_sub(user)
+
+        assert Token.get_user_from_string(token, session) == user
+
+    def test_email_fallback_disabled(
+        self, user: User, session: Session, monkeypatch: pytest.MonkeyPatch
+    ):
+        token = _make_token_without_sub(user)
+        monkeypatch.setattr(Token, "email_fallback", False)
+
+        with pytest.raises(TokenError):
+            Token.get_user_from_string(token, session)
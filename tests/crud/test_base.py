@@ -0,0 +1,117 @@
+import uuid
+from typing import Optional
+
+import pytest
+from sqlalchemy.exc import NoResultFound
+from sqlmodel import Field, Session, SQLModel, select
+
+import crud
+from crud.base import BaseCRUDService
+from models import User
+
+
+class FactoryDefaultItem(SQLModel, table=True):
+    __tablename__ = "test_factory_default_items"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    key: str = Field(default_factory=lambda: uuid.uuid4().hex)
+
+
+class TestList:
+    def test_fields(self, session: Session, user_factory):
+        users = user_factory.create_batch(2)
+
+        items = crud.user.list(session, fields=["id", "email"])
+
+        assert items == [{"id": u.id, "email": u.email} for u in users]
+
+    def test_unknown_field(self, session: Session):
+        with pytest.raises(ValueError):
+            crud.user.list(session, fields=["id", "unknown"])
+
+
+class TestCursorPaginate:
+    def test_fields(self, session: Session, user_factory):
+        users = user_factory.create_batch(3)
+
+        items, next_cursor = crud.user.cursor_paginate(
+            session, size=2, order_by="email", fields=["id"]
+        )
+
+        expected = sorted(users, key=lambda u: u.email)[:2]
+        assert [item["id"] for item in items] == [u.id for u in expected]
+        assert next_cursor is not None
+
+
+class TestBulkCreate:
+    def test_ok(self, session: Session):
+        data_list = [{"email": f"bulk-{i}@test.com"} for i in range(5)]
+
+        created = crud.user.bulk_create(session, data_list, chunk_size=2)
+
+        users = session.exec(select(User).order_by(User.id)).all()
+        assert created == 5
+        assert [u.email for u in users] == [d["email"] for d in data_list]
+        assert not any(u.is_admin for u in users)
+
+    def test_not_allowed_key(self, session: Session):
+        with pytest.raises(ValueError):
+            crud.user.bulk_create(session, [{"email": "a@test.com", "unknown": 1}])
+
+    def test_default_factory(self):
+        service = BaseCRUDService(FactoryDefaultItem)
+
+        params = service.bulk_insert_params([{}, {}, {"key": "given"}])
+
+        assert params[0]["key"] != params[1]["key"]
+        assert params[2]["key"] == "given"
+
+
+class TestBulkUpdate:
+    def test_ok(self, session: Session, user_factory):
+        users = user_factory.create_batch(3)
+        ids = [u.id for u in users[:2]]
+
+        updated = crud.user.bulk_update(
+            session, ids, {"full_name": "Updated"}, chunk_size=1
+        )
+
+        for user in users:
+            session.refresh(user)
+        assert updated == 2
+        assert [u.full_name for u in users] == ["Updated", "Updated", None]
+
+
+class TestBulkDelete:
+    def test_ok(self, session: Session, user_factory):
+        users = user_factory.create_batch(3)
+
+        deleted = crud.user.bulk_delete(session, [u.id for u in users[:2]])
+
+        assert deleted == 2
+        assert session.exec(select(User.id)).all() == [users[2].id]
+
+
+class TestUpdateById:
+    def test_ok(self, session: Session, user: User):
+        crud.user.update_by_id(session, user.id, {"full_name": "Updated"})
+
+        session.refresh(user)
+        assert user.full_name == "Updated"
+
+    def test_not_found(self, session: Session):
+        with pytest.raises(NoResultFound):
+            crud.user.update_by_id(session, 0, {"full_name": "Updated"})
+
+
+class TestDeleteById:
+    def test_ok(self, session: Session, user_factory):
+        users = user_factory.create_batch(2)
+
+        crud.user.delete_by_id(session, users[0].id)
+
+        assert session.exec(select(User.id)).all() == [users[1].id]
+
+    def test_not_found(self, session: Session):
+        with pytest.raises(NoResultFound):
+            crud.user.delete_by_id(session, 0)
@@ -1,6 +1,7 @@
 import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
+from sqlmodel import Session
 
 from core.token import Token
 from models import User
@@ -23,6 +24,7 @@ def as_user(client: TestClient, user: User) -> TestClient:
 
 
 @pytest.fixture
-def as_admin(client: TestClient, user: User) -> TestClient:
+def as_admin(client: TestClient, user: User, session: Session) -> TestClient:
     user.is_admin = True
+    session.commit()
     return _make_api_client(client, user)
@@ -2,20 +2,40 @@ import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.engine import Connection
 from sqlalchemy.engine.base import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
 from sqlalchemy_utils import create_database, database_exists, drop_database
 from sqlmodel import SQLModel
 
-from config.settings import settings
+from config.db import get_async_database_url
+from core.metrics import install_query_metrics
+from core.profiling import install_query_capture
 from tests.session import TestSession
 
+TEST_DATABASE_URL = "sqlite:///./test_db.sqlite"
+
 
 @pytest.fixture(scope="session")
 def db_engine():
     engine = create_engine(
-        "sqlite:///./test_db.sqlite",
-        echo=settings.SQLALCHEMY_ECHO,
+        TEST_DATABASE_URL,
         connect_args={"check_same_thread": False},
     )
+    install_query_metrics(engine)
+    install_query_capture(engine)
+    return engine
+
+
+@pytest.fixture(scope="session")
+def async_db_engine() -> AsyncEngine:
+    # Every TestClient request runs in its own event loop,
+    # so async connections must not be reused between requests
+    engine = create_async_engine(
+        get_async_database_url(TEST_DATABASE_URL),
+        poolclass=NullPool,
+    )
+    install_query_metrics(engine.sync_engine)
+    install_query_capture(engine.sync_engine)
     return engine
 
 
@@ -41,12 +61,14 @@ def connection(db_engine: Engine, _create_tables):
 
 @pytest.fixture(autouse=True)
 def session(connection: Connection):
-    transaction = connection.begin()
-
+    # Application uses its own async connections, which can't see data of
+    # uncommitted transaction, so data is committed and tables are cleaned up
     session = TestSession(bind=connection)
 
     try:
         yield session
     finally:
         TestSession.remove()
-        transaction.rollback()
+        with connection.begin():
+            for table in reversed(SQLModel.metadata.sorted_tables):
+                connection.execute(table.delete())
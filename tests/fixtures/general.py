@@ -1,14 +1,46 @@
 import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from config.asgi import init_app
-from config.db import get_session
+from config.db import get_async_session, get_session
+from core.known_emails import known_emails
+from core.metrics import registry
+from core.rate_limit import rate_limit_backend
+from core.revocation import revocation_index
+from core.token import token_cache
 
 
 @pytest.fixture
-def app(session: Session):
+def app(session: Session, async_db_engine: AsyncEngine):
     app = init_app()
 
+    async def _get_async_session():
+        async with AsyncSession(async_db_engine, expire_on_commit=False) as _session:
+            yield _session
+
     app.dependency_overrides[get_session] = lambda: session
+    app.dependency_overrides[get_async_session] = _get_async_session
 
     return app
+
+
+@pytest.fixture(autouse=True)
+def _clear_token_cache():
+    yield
+    token_cache.clear()
+    revocation_index.clear()
+    known_emails.clear()
+
+
+@pytest.fixture(autouse=True)
+def _clear_rate_limits():
+    yield
+    rate_limit_backend.clear()
+
+
+@pytest.fixture(autouse=True)
+def _clear_metrics():
+    yield
+    registry.clear()
@@ -0,0 +1,49 @@
+from fastapi.testclient import TestClient
+
+from models import User
+
+
+class TestDatabasePools:
+    url = "/monitoring/db-pool/"
+
+    def test_ok(self, as_admin: TestClient):
+        response = as_admin.get(self.url)
+
+        assert response.status_code == 200
+        assert response.json()["sync"]["pool_class"] == "MeteredSingletonThreadPool"
+        assert response.json()["async"]["pool_class"] == "MeteredAsyncAdaptedQueuePool"
+
+    def test_not_admin(self, as_user: TestClient):
+        response = as_user.get(self.url)
+
+        assert response.status_code == 403
+
+
+class TestMetrics:
+    url = "/metrics"
+
+    def test_ok(self, as_user: TestClient, user: User):
+        as_user.get(f"/users/{user.id}/")
+
+        response = as_user.get(self.url)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        labels = 'method="GET",route="/users/{id}"'
+        assert f'http_request_duration_seconds_count{{{labels},status="200"}} 1' in (
+            response.text
+        )
+        assert f'http_request_db_queries_bucket{{{labels},le="0"}} 0' in response.text
+        assert 'jwt_duration_seconds_count{operation="decode"} 1' in response.text
+
+    def test_password_hashing(self, client: TestClient, user: User):
+        client.post(
+            "/auth/login/", json={"email": user.email, "password": "test_password"}
+        )
+
+        response = client.get(self.url)
+
+        assert 'password_hashing_duration_seconds_count{operation="verify"} 1' in (
+            response.text
+        )
+        assert 'jwt_duration_seconds_count{operation="encode"} 2' in response.text
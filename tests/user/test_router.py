@@ -1,7 +1,12 @@
+import csv
+import json
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlmodel import Session, select
 
+from config.settings import settings
+from core.pagination import encode_cursor
 from models import User
 
 
@@ -18,6 +23,90 @@ class TestListUser:
         assert response.status_code == 200
         assert response.json()["items"] == [self.get_user_data(user)]
 
+    def test_pagination(self, user: User, user_factory, as_admin: TestClient):
+        users = [user, *user_factory.create_batch(4)]
+
+        response = as_admin.get(self.url, params={"page": 2, "size": 2})
+
+        assert response.status_code == 200
+        assert response.json()["total"] == len(users)
+        assert response.json()["items"] == [self.get_user_data(u) for u in users[2:4]]
+
+    def test_orjson(self, user: User, as_admin: TestClient, monkeypatch):
+        monkeypatch.setattr(settings, "ORJSON_RESPONSE", True)
+
+        response = as_admin.get(self.url)
+
+        assert response.status_code == 200
+        assert response.json()["items"] == [self.get_user_data(user)]
+
+
+class TestCursorListUser:
+    url = "/users/cursor/"
+
+    def test_ok(self, user: User, user_factory, as_admin: TestClient):
+        users = [user, *user_factory.create_batch(4)]
+
+        first = as_admin.get(self.url, params={"size": 3}).json()
+        second = as_admin.get(
+            self.url, params={"size": 3, "cursor": first["next_cursor"]}
+        ).json()
+
+        assert [u["id"] for u in first["items"] + second["items"]] == [
+            u.id for u in users
+        ]
+        assert second["next_cursor"] is None
+
+    def test_order_by_email(self, user: User, user_factory, as_admin: TestClient):
+        users = [user, *user_factory.create_batch(2)]
+
+        first = as_admin.get(self.url, params={"size": 2, "order_by": "email"}).json()
+        second = as_admin.get(
+            self.url,
+            params={"size": 2, "order_by": "email", "cursor": first["next_cursor"]},
+        ).json()
+
+        assert [u["email"] for u in first["items"] + second["items"]] == sorted(
+            u.email for u in users
+        )
+
+    @pytest.mark.parametrize(
+        "values", ["invalid", [], [1, 2], [{"id": 1}], [[1]]], ids=str
+    )
+    def test_invalid_cursor(self, as_admin: TestClient, values):
+        cursor = "invalid" if values == "invalid" else encode_cursor(values)
+
+        response = as_admin.get(self.url, params={"cursor": cursor})
+
+        assert response.status_code == 400
+
+
+class TestExportUser:
+    url = "/users/export/"
+
+    def test_ok(self, user: User, user_factory, as_admin: TestClient):
+        users = [user, *user_factory.create_batch(2)]
+
+        response = as_admin.get(self.url)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["email"] for row in rows] == [u.email for u in users]
+        assert "password" not in rows[0] and "password_hash" not in rows[0]
+
+    def test_csv(self, user: User, as_admin: TestClient):
+        response = as_admin.get(self.url, params={"format": "csv"})
+
+        assert response.status_code == 200
+        rows = list(csv.DictReader(response.text.splitlines()))
+        assert [row["email"] for row in rows] == [user.email]
+
+    def test_not_admin(self, as_user: TestClient):
+        response = as_user.get(self.url)
+
+        assert response.status_code == 403
+
 
 class TestRetrieveUser:
     url = "/users/{}/"
@@ -45,12 +134,38 @@ class TestUpdateUser:
     def update_data(self):
         return {"full_name": "New full name"}
 
-    def test_ok(self, user: User, as_user: TestClient, update_data: dict):
+    def test_ok(
+        self, user: User, as_user: TestClient, update_data: dict, session: Session
+    ):
         response = as_user.patch(self.url.format(user.id), json=update_data)
 
         assert response.status_code == 204
+        session.refresh(user)
         assert user.full_name == update_data["full_name"]
 
+    def test_other_user(self, user_factory, as_user: TestClient, update_data: dict):
+        other = user_factory.create()
+
+        response = as_user.patch(self.url.format(other.id), json=update_data)
+
+        assert response.status_code == 403
+
+    def test_admin(
+        self, user_factory, as_admin: TestClient, update_data: dict, session: Session
+    ):
+        other = user_factory.create()
+
+        response = as_admin.patch(self.url.format(other.id), json=update_data)
+
+        assert response.status_code == 204
+        session.refresh(other)
+        assert other.full_name == update_data["full_name"]
+
+    def test_not_found(self, as_admin: TestClient, update_data: dict):
+        response = as_admin.patch(self.url.format(0), json=update_data)
+
+        assert response.status_code == 404
+
 
 class TestDeleteUser:
     url = "/users/{}/"
@@ -67,3 +182,16 @@ class TestDeleteUser:
         assert (
             session.exec(select(User).where(User.id == user.id)).one_or_none() is None
         )
+
+    def test_not_found(self, as_user: TestClient):
+        response = as_user.delete(self.url.format(0))
+
+        assert response.status_code == 404
+
+    def test_token_is_rejected_after_delete(self, user: User, as_user: TestClient):
+        assert as_user.get(self.url.format(user.id)).status_code == 200
+
+        as_user.delete(self.url.format(user.id))
+        response = as_user.get(self.url.format(user.id))
+
+        assert response.status_code == 401
@@ -0,0 +1,57 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from sqlmodel import Session, select
+
+from models import User
+from user.services import import_users, read_user_rows
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(2) as _executor:
+        yield _executor
+
+
+class TestReadUserRows:
+    def test_csv(self, tmp_path: Path):
+        path = tmp_path / "users.csv"
+        path.write_text("email,password\na@test.com,secret\n")
+
+        assert list(read_user_rows(path)) == [
+            {"email": "a@test.com", "password": "secret"}
+        ]
+
+    def test_jsonl(self, tmp_path: Path):
+        path = tmp_path / "users.jsonl"
+        path.write_text('{"email": "a@test.com"}\n\n{"email": "b@test.com"}\n')
+
+        assert [row["email"] for row in read_user_rows(path)] == [
+            "a@test.com",
+            "b@test.com",
+        ]
+
+
+class TestImportUsers:
+    def test_ok(self, session: Session, executor: ThreadPoolExecutor):
+        password_hash = User.hash_password("hashed")
+        rows = [
+            {"email": "a@test.com", "password": "plain", "is_admin": "true"},
+            {"email": "b@test.com", "password_hash": password_hash},
+            {"email": "c@test.com", "password": "plain"},
+        ]
+
+        counts = list(import_users(session, rows, executor=executor, chunk_size=2))
+
+        users = session.exec(select(User).order_by(User.id)).all()
+        assert counts == [2, 1]
+        assert [u.is_admin for u in users] == [True, False, False]
+        assert users[0].check_password("plain")
+        assert users[1].password == password_hash
+
+    def test_unknown_hash(self, session: Session, executor: ThreadPoolExecutor):
+        rows = [{"email": "a@test.com", "password_hash": "not a hash"}]
+
+        with pytest.raises(ValueError):
+            list(import_users(session, rows, executor=executor))
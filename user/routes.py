@@ -1,67 +1,138 @@
-from fastapi import APIRouter, Depends
-from fastapi_pagination import Page, paginate
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from fastapi_pagination import Page
+from sqlalchemy.exc import NoResultFound
+from sqlmodel.ext.asyncio.session import AsyncSession
 from starlette import status
 
 import crud
-from config.db import Session, get_session
+from config.db import get_async_session
 from core import responses
 from core.deps import get_admin_user, get_current_user
+from core.exceptions import BadRequestError, NotFoundError, PermissionDeniedError
+from core.pagination import CursorPage
+from core.renderers import get_default_response_class
 from models import User
 from user import schema
+from user.services import ExportFormat, export_users_async
 
 router = APIRouter()
 
+LIST_USER_FIELDS = list(schema.ListUserSchema.__fields__)
+
 
 @router.get(
     "/",
     responses=responses.UNAUTHORIZED | responses.PERMISSION_DENIED,
     response_model=Page[schema.ListUserSchema],
 )
-def list_users(
-    session: Session = Depends(get_session), admin: User = Depends(get_admin_user)
+async def list_users(
+    session: AsyncSession = Depends(get_async_session),
+    admin: User = Depends(get_admin_user),
 ):
     """Getting all users"""
 
-    return paginate(crud.user.list(session))
+    page = await crud.async_user.paginate(session, fields=LIST_USER_FIELDS)
+    # Page items are already validated by paginate, response_model is only
+    # kept for OpenAPI schema
+    return get_default_response_class()(page.dict())
+
+
+@router.get(
+    "/cursor",
+    responses=responses.UNAUTHORIZED
+    | responses.PERMISSION_DENIED
+    | responses.BAD_REQUEST,
+    response_model=CursorPage[schema.ListUserSchema],
+)
+async def list_users_by_cursor(
+    cursor: str | None = None,
+    size: int = Query(50, ge=1, le=100),
+    order_by: str = "id",
+    session: AsyncSession = Depends(get_async_session),
+    admin: User = Depends(get_admin_user),
+):
+    """Getting users page after cursor"""
+
+    try:
+        items, next_cursor = await crud.async_user.cursor_paginate(
+            session, cursor, size=size, order_by=order_by, fields=LIST_USER_FIELDS
+        )
+    except ValueError as e:
+        raise BadRequestError(str(e))
+
+    # Items are projected to fields of ListUserSchema, so they aren't validated again
+    return get_default_response_class()({"items": items, "next_cursor": next_cursor})
+
+
+@router.get(
+    "/export",
+    responses=responses.UNAUTHORIZED | responses.PERMISSION_DENIED,
+    response_class=StreamingResponse,
+)
+async def export_users(
+    format: ExportFormat = ExportFormat.ndjson,
+    session: AsyncSession = Depends(get_async_session),
+    admin: User = Depends(get_admin_user),
+):
+    """Export all users as NDJSON or CSV stream"""
+
+    media_type = "text/csv" if format == ExportFormat.csv else "application/x-ndjson"
+    return StreamingResponse(
+        export_users_async(session, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=users.{format.value}"},
+    )
 
 
 @router.get(
     "/{id}", responses=responses.UNAUTHORIZED, response_model=schema.RetrieveUserSchema
 )
-def retrieve_user(
+async def retrieve_user(
     id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     user: User = Depends(get_current_user),
 ):
     """Getting user by id"""
 
-    return crud.user.get(session, id)
+    return await crud.async_user.get(session, id)
 
 
 @router.patch(
     "/{id}",
-    responses=responses.UNAUTHORIZED,
+    responses=responses.CRUD_RESPONSES,
     status_code=status.HTTP_204_NO_CONTENT,
 )
-def update_user(
+async def update_user(
+    id: int,
     data: schema.UpdateUserSchema,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     user: User = Depends(get_current_user),
 ):
-    """Update user by id"""
+    """Update user by id, users can only update themselves, admins anyone"""
+
+    if id != user.id and not user.is_admin:
+        raise PermissionDeniedError
 
-    crud.user.update(session, user, data.dict())
+    try:
+        await crud.async_user.update_by_id(session, id, data.dict(exclude_unset=True))
+    except NoResultFound:
+        raise NotFoundError
 
 
 @router.delete(
-    "/{id}", responses=responses.UNAUTHORIZED, status_code=status.HTTP_204_NO_CONTENT
+    "/{id}",
+    responses=responses.UNAUTHORIZED | responses.NOT_FOUND,
+    status_code=status.HTTP_204_NO_CONTENT,
 )
-def delete_user(
+async def delete_user(
     id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
 ):
     """Delete user by id"""
 
-    user = crud.user.get(session, id)
-    crud.user.delete(session, user)
+    try:
+        await crud.async_user.delete_by_id(session, id)
+    except NoResultFound:
+        raise NotFoundError
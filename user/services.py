@@ -0,0 +1,161 @@
+import csv
+import io
+import json
+from concurrent.futures import Executor
+from enum import Enum
+from itertools import islice
+from pathlib import Path
+from typing import Any, AsyncIterator, Iterable, Iterator, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.sql import Select
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import crud
+from common.types import DataDict
+from core import hashing
+from models import User
+
+EXPORT_FIELDS = ["id", "email", "full_name", "is_admin"]
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+def read_user_rows(path: Path) -> Iterator[DataDict]:
+    """
+    Stream rows of CSV or JSON lines file one by one
+    """
+    with path.open(newline="") as file:
+        if path.suffix.lower() == ".csv":
+            yield from csv.DictReader(file)
+            return
+
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _parse_bool(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes")
+    return bool(value)
+
+
+def _prepare_users(rows: list[DataDict], executor: Executor) -> list[DataDict]:
+    """
+    Convert raw rows to user data, hashing plain passwords in parallel
+    """
+    users = []
+    plain_passwords = {}
+    for row in rows:
+        if not row.get("email"):
+            raise ValueError(f"Row {row} has no email")
+
+        password_hash = row.get("password_hash") or None
+        if password_hash and not hashing.crypto_context.identify(password_hash):
+            raise ValueError(f"Unknown password hash of {row['email']}")
+        if not password_hash and row.get("password"):
+            plain_passwords[len(users)] = row["password"]
+
+        users.append(
+            {
+                "email": row["email"],
+                "full_name": row.get("full_name") or None,
+                "is_admin": _parse_bool(row.get("is_admin")),
+                "password": password_hash,
+            }
+        )
+
+    hashes = executor.map(hashing.hash_password, plain_passwords.values())
+    for index, password_hash in zip(plain_passwords, hashes):
+        users[index]["password"] = password_hash
+
+    return users
+
+
+def import_users(
+    session: Session,
+    rows: Iterable[DataDict],
+    *,
+    executor: Executor,
+    chunk_size: int = 1000,
+) -> Iterator[int]:
+    """
+    Create users from rows, committing every chunk in its own transaction
+    Yields number of rows imported by each committed chunk
+    """
+    rows = iter(rows)
+    while chunk := list(islice(rows, chunk_size)):
+        users = _prepare_users(chunk, executor)
+        crud.user.bulk_create(session, users, chunk_size=chunk_size)
+        yield len(users)
+
+
+def _get_export_fields(include_password_hash: bool) -> list[str]:
+    return EXPORT_FIELDS + ["password_hash"] if include_password_hash else EXPORT_FIELDS
+
+
+def _get_export_query(include_password_hash: bool, batch_size: int) -> Select:
+    columns = [getattr(User, field) for field in EXPORT_FIELDS]
+    if include_password_hash:
+        columns.append(User.password)
+    # yield_per streams rows from server side cursor in batches
+    return select(*columns).order_by(User.id).execution_options(yield_per=batch_size)
+
+
+def _format_export_header(fields: list[str], format: ExportFormat) -> str:
+    if format == ExportFormat.csv:
+        return _format_export_rows([fields], fields, format)
+    return ""
+
+
+def _format_export_rows(
+    rows: Sequence[Sequence[Any]], fields: list[str], format: ExportFormat
+) -> str:
+    if format == ExportFormat.csv:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue()
+
+    return "".join(
+        json.dumps(dict(zip(fields, row)), separators=(",", ":")) + "\n" for row in rows
+    )
+
+
+def export_users(
+    session: Session,
+    format: ExportFormat = ExportFormat.ndjson,
+    *,
+    batch_size: int = 1000,
+    include_password_hash: bool = False,
+) -> Iterator[str]:
+    """
+    Stream users as NDJSON or CSV text, one chunk per fetched batch
+    """
+    fields = _get_export_fields(include_password_hash)
+    yield _format_export_header(fields, format)
+
+    result = session.execute(_get_export_query(include_password_hash, batch_size))
+    for rows in result.partitions():
+        yield _format_export_rows(rows, fields, format)
+
+
+async def export_users_async(
+    session: AsyncSession,
+    format: ExportFormat = ExportFormat.ndjson,
+    *,
+    batch_size: int = 1000,
+) -> AsyncIterator[str]:
+    """
+    Same as export_users, but streams with AsyncSession
+    """
+    fields = _get_export_fields(include_password_hash=False)
+    yield _format_export_header(fields, format)
+
+    result = await session.stream(_get_export_query(False, batch_size))
+    async for rows in result.partitions():
+        yield _format_export_rows(rows, fields, format)